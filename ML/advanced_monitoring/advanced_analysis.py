@@ -8,14 +8,19 @@ from sklearn.model_selection import learning_curve
 import tensorflow as tf
 import joblib
 from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from artifact_cache import cached_dataset, cached_model
 
 def analyze_feature_importance():
     """Analyze and visualize feature importance for load classification"""
     print("Analyzing Feature Importance...")
     
     # Load data and model
-    df = pd.read_csv("data/vibration_load_patterns.csv")
-    load_model = joblib.load("models/load_classification_model.pkl")
+    df = cached_dataset("data/vibration_load_patterns.csv")
+    load_model = cached_model("models/load_classification_model.pkl")
     
     # Get feature importance
     features = ['Vibration_Level', 'Motor_Current', 'Power_Consumption']
@@ -34,8 +39,8 @@ def analyze_learning_curves():
     print("Analyzing Learning Curves...")
     
     # Load data
-    load_df = pd.read_csv("data/vibration_load_patterns.csv")
-    speed_df = pd.read_csv("data/motor_speed_data.csv")
+    load_df = cached_dataset("data/vibration_load_patterns.csv")
+    speed_df = cached_dataset("data/motor_speed_data.csv")
     
     # Prepare data for load classification
     X_load = load_df[['Vibration_Level', 'Motor_Current', 'Power_Consumption']]
@@ -46,8 +51,8 @@ def analyze_learning_curves():
     y_speed = speed_df['Optimal_Speed']
     
     # Load models
-    load_model = joblib.load("models/load_classification_model.pkl")
-    speed_model = joblib.load("models/speed_optimization_model.pkl")
+    load_model = cached_model("models/load_classification_model.pkl")
+    speed_model = cached_model("models/speed_optimization_model.pkl")
     
     # Generate learning curves for load classification
     plt.figure(figsize=(12, 5))
@@ -99,10 +104,10 @@ def analyze_error_distribution():
     print("Analyzing Error Distribution...")
     
     # Load data
-    speed_df = pd.read_csv("data/motor_speed_data.csv")
+    speed_df = cached_dataset("data/motor_speed_data.csv")
     
     # Load model
-    speed_model = joblib.load("models/speed_optimization_model.pkl")
+    speed_model = cached_model("models/speed_optimization_model.pkl")
     
     # Get predictions
     X = speed_df[['Required_Flow_Rate', 'System_Pressure', 'Power_Consumption']]
@@ -137,8 +142,9 @@ def analyze_temporal_patterns():
     print("Analyzing Temporal Patterns...")
     
     # Load data
-    df = pd.read_csv("data/vibration_usage_patterns.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+    df = cached_dataset("data/vibration_usage_patterns.csv",
+                        columns=['Timestamp', 'Hour', 'Day', 'Vibration_Level', 'Usage_Frequency',
+                                 'Temperature', 'Usage_Label'])
     
     # Create figure
     plt.figure(figsize=(15, 10))
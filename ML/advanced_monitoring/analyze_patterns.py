@@ -6,6 +6,13 @@ from sklearn.metrics import confusion_matrix, classification_report, accuracy_sc
 import tensorflow as tf
 import joblib
 from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from artifact_cache import cached_dataset, cached_model
+from build_cache import write_if_changed
+from usage_windows import USAGE_FEATURES, usage_series, window_dataset, window_targets
 
 # Set style for better visualizations
 sns.set_theme(style="whitegrid")
@@ -15,8 +22,8 @@ def analyze_usage_patterns():
     print("\nAnalyzing Usage Patterns...")
     
     # Load data
-    df = pd.read_csv("data/vibration_usage_patterns.csv")
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+    df = cached_dataset("data/vibration_usage_patterns.csv",
+                        columns=['Hour', 'Day', 'Vibration_Level', 'Usage_Frequency', 'Temperature', 'Usage_Label'])
     
     # Create figure with subplots
     fig = plt.figure(figsize=(20, 12))
@@ -57,7 +64,7 @@ def analyze_load_patterns():
     print("Analyzing Load Patterns...")
     
     # Load data
-    df = pd.read_csv("data/vibration_load_patterns.csv")
+    df = cached_dataset("data/vibration_load_patterns.csv")
     
     # Create figure with subplots
     fig = plt.figure(figsize=(20, 12))
@@ -93,7 +100,7 @@ def analyze_speed_optimization():
     print("Analyzing Speed Optimization...")
     
     # Load data
-    df = pd.read_csv("data/motor_speed_data.csv")
+    df = cached_dataset("data/motor_speed_data.csv")
     
     # Create figure with subplots
     fig = plt.figure(figsize=(20, 12))
@@ -129,24 +136,25 @@ def analyze_model_performance():
     print("Analyzing Model Performance...")
     
     # Load test data
-    usage_df = pd.read_csv("data/vibration_usage_patterns.csv")
-    load_df = pd.read_csv("data/vibration_load_patterns.csv")
-    speed_df = pd.read_csv("data/motor_speed_data.csv")
+    usage_df = cached_dataset("data/vibration_usage_patterns.csv",
+                              columns=['Timestamp'] + USAGE_FEATURES + ['Usage_Label'])
+    load_df = cached_dataset("data/vibration_load_patterns.csv")
+    speed_df = cached_dataset("data/motor_speed_data.csv")
     
     # Load models
-    usage_model = tf.keras.models.load_model("models/usage_prediction_model.h5")
-    load_model = joblib.load("models/load_classification_model.pkl")
-    speed_model = joblib.load("models/speed_optimization_model.pkl")
+    usage_model = cached_model("models/usage_prediction_model.h5", tf.keras.models.load_model)
+    load_model = cached_model("models/load_classification_model.pkl")
+    speed_model = cached_model("models/speed_optimization_model.pkl")
     
     # Create figure with subplots
     fig = plt.figure(figsize=(20, 15))
     
     # 1. Usage Model Confusion Matrix
     plt.subplot(2, 2, 1)
-    X_usage = usage_df[['Hour', 'Day', 'Vibration_Level', 'Usage_Frequency']].values
-    X_usage = X_usage.reshape((X_usage.shape[0], 1, X_usage.shape[1]))
-    y_usage = (usage_df['Usage_Label'] == 'High Usage').astype(int)
-    y_pred_usage = (usage_model.predict(X_usage) > 0.5).astype(int)
+    window = usage_model.input_shape[1]
+    X_usage, y_usage = usage_series(usage_df)
+    y_usage = window_targets(y_usage, window)
+    y_pred_usage = (usage_model.predict(window_dataset(X_usage, window=window, batch_size=256)) > 0.5).astype(int)
     cm_usage = confusion_matrix(y_usage, y_pred_usage)
     sns.heatmap(cm_usage, annot=True, fmt='d', cmap='Blues')
     plt.title('Usage Prediction Confusion Matrix')
@@ -237,8 +245,9 @@ def generate_html_report():
     </html>
     """
     
-    with open('plots/analysis_report.html', 'w') as f:
-        f.write(html_content)
+    # Unchanged reports are left alone so their mtime (and any cache of them) stays valid
+    if not write_if_changed('plots/analysis_report.html', html_content):
+        print("Analysis report unchanged")
 
 if __name__ == "__main__":
     # Create plots directory
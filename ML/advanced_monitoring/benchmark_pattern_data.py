@@ -0,0 +1,40 @@
+import argparse
+import time
+import numpy as np
+from generate_pattern_data import (
+    generate_usage_pattern_data, generate_load_pattern_data,
+    generate_start_stop_data, generate_speed_optimization_data,
+    generate_usage_pattern_data_vectorized, generate_load_pattern_data_vectorized,
+    generate_start_stop_data_vectorized, generate_speed_optimization_data_vectorized
+)
+
+# (loop generator, vectorized generator, rows per unit of the size argument)
+GENERATORS = {
+    'usage': (generate_usage_pattern_data, generate_usage_pattern_data_vectorized, 48),
+    'load': (generate_load_pattern_data, generate_load_pattern_data_vectorized, 1),
+    'start_stop': (generate_start_stop_data, generate_start_stop_data_vectorized, 1),
+    'speed': (generate_speed_optimization_data, generate_speed_optimization_data_vectorized, 1)
+}
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run_benchmark(loop_rows, large_rows):
+    """Time loop vs vectorized generators, then the vectorized ones at scale"""
+    rng = np.random.default_rng(42)
+    print(f"{'dataset':<12}{'loop rows/s':>14}{'vectorized rows/s':>20}{f'{large_rows:,} rows (s)':>22}")
+    for name, (loop, vectorized, rows_per_unit) in GENERATORS.items():
+        loop_df, loop_time = timed(loop, max(1, loop_rows // rows_per_unit))
+        vec_df, vec_time = timed(vectorized, max(1, loop_rows // rows_per_unit), rng=rng)
+        assert list(loop_df.columns) == list(vec_df.columns)
+        large_df, large_time = timed(vectorized, max(1, large_rows // rows_per_unit), rng=rng)
+        print(f"{name:<12}{len(loop_df) / loop_time:>14,.0f}{len(vec_df) / vec_time:>20,.0f}{large_time:>22.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pattern data generators")
+    parser.add_argument('--loop-rows', type=int, default=20_000)
+    parser.add_argument('--large-rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+    run_benchmark(args.loop_rows, args.large_rows)
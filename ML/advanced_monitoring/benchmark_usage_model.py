@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dataset_io import load_dataset
+from usage_windows import sliding_windows, usage_series
+
+# Each backend is started in a fresh interpreter so import cost and RSS are isolated
+STARTUP_SCRIPTS = {
+    'tf': """
+import tensorflow as tf
+model = tf.keras.models.load_model("models/usage_prediction_model.h5")
+model.predict(np.zeros((1, model.input_shape[1], 4), dtype=np.float32), verbose=0)
+""",
+    'numpy': """
+from numpy_lstm import NumpyLSTMModel
+model = NumpyLSTMModel.load("models/usage_prediction_model.npz")
+model.predict(np.zeros((1, model.window, 4), dtype=np.float32))
+"""
+}
+
+# Peak RSS is read from VmHWM, ru_maxrss would include the (TF-loaded) parent
+STARTUP_TEMPLATE = """
+import time
+start = time.perf_counter()
+import numpy as np
+{body}
+elapsed = time.perf_counter() - start
+with open('/proc/self/status') as f:
+    hwm = next(line.split()[1] for line in f if line.startswith('VmHWM'))
+print(elapsed, hwm)
+"""
+
+def check_parity(tolerance=1e-5):
+    """Compare the NumPy forward pass with the Keras model over the usage dataset"""
+    import tensorflow as tf
+    from numpy_lstm import NumpyLSTMModel
+
+    df = load_dataset("data/vibration_usage_patterns.csv")
+    keras_model = tf.keras.models.load_model("models/usage_prediction_model.h5")
+    X = sliding_windows(usage_series(df)[0], keras_model.input_shape[1])
+
+    keras_out = keras_model.predict(X, verbose=0)
+    numpy_out = NumpyLSTMModel.load("models/usage_prediction_model.npz").predict(X)
+
+    max_diff = float(np.abs(keras_out - numpy_out).max())
+    label_mismatches = int(np.count_nonzero((keras_out > 0.5) != (numpy_out > 0.5)))
+    print(f"Parity over {len(X)} windows: max abs diff {max_diff:.2e}, {label_mismatches} label mismatches")
+    return max_diff <= tolerance and label_mismatches == 0
+
+def measure_startup(backend, runs=3):
+    """Median import+load+first-predict time and peak RSS of a backend in a fresh process"""
+    script = STARTUP_TEMPLATE.format(body=STARTUP_SCRIPTS[backend])
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='3')
+    timings, rss = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                                text=True, check=True, env=env).stdout.split()
+        timings.append(float(output[-2]))
+        rss.append(int(output[-1]) / 1024)  # VmHWM is in KiB
+    return float(np.median(timings)), float(np.median(rss))
+
+if __name__ == "__main__":
+    ok = check_parity()
+
+    print(f"\n{'backend':<10}{'startup (s)':>14}{'peak RSS (MiB)':>18}")
+    for backend in STARTUP_SCRIPTS:
+        startup, rss = measure_startup(backend)
+        print(f"{backend:<10}{startup:>14.2f}{rss:>18.1f}")
+
+    sys.exit(0 if ok else 1)
@@ -3,13 +3,27 @@ from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import markdown
 import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from build_cache import build
+
+PAPER_SOURCE = 'conference_paper.docx'  # markdown text despite the extension
+PAPER_PATH = 'Advanced_Motor_Pattern_Learning.docx'
+
+def paper_inputs():
+    """The paper source, this script and every plot it references"""
+    with open(PAPER_SOURCE, 'r') as f:
+        images = re.findall(r'\[Insert ([^\]]+)\]', f.read())
+    return [PAPER_SOURCE, os.path.relpath(__file__)] + [f'plots/{image}' for image in images]
 
 def create_conference_paper():
     # Create a new Document
     doc = Document()
     
     # Read the markdown content
-    with open('conference_paper.docx', 'r') as f:
+    with open(PAPER_SOURCE, 'r') as f:
         content = f.read()
     
     # Split content into sections
@@ -52,8 +66,8 @@ def create_conference_paper():
             doc.add_paragraph(content)
     
     # Save the document
-    doc.save('Advanced_Motor_Pattern_Learning.docx')
+    doc.save(PAPER_PATH)
     print("✅ Conference paper generated successfully!")
 
 if __name__ == "__main__":
-    create_conference_paper()
+    build(PAPER_PATH, paper_inputs(), create_conference_paper, force='--force' in sys.argv)
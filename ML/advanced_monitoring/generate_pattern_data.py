@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dataset_io import save_dataset
 
 def generate_usage_pattern_data(days=30):
     """Generate synthetic data for usage pattern analysis"""
@@ -125,28 +130,146 @@ def generate_speed_optimization_data(n_samples=1000):
     
     return pd.DataFrame(data)
 
+def generate_usage_pattern_data_vectorized(days=30, rng=None, base_date=None):
+    """Array-based equivalent of generate_usage_pattern_data"""
+    rng = rng if rng is not None else np.random.default_rng()
+    base_date = base_date if base_date is not None else datetime.now() - timedelta(days=days)
+    # Microsecond resolution so very long ranges do not overflow datetime64[ns]
+    timestamps = pd.date_range(base_date, periods=48 * days, freq='30min', unit='us')
+    n = len(timestamps)
+    hour = timestamps.hour.to_numpy().astype(np.int64)
+    day = timestamps.weekday.to_numpy().astype(np.int64)
+    
+    # Time-based patterns: morning peak, evening peak, normal hours
+    morning = (hour >= 6) & (hour <= 9)
+    evening = (hour >= 17) & (hour <= 20)
+    low = np.select([morning, evening], [0.7, 0.6], 0.2)
+    high = np.select([morning, evening], [1.0, 0.9], 0.5)
+    usage_freq = low + (high - low) * rng.random(n)
+    base_vibration = (2000 + rng.normal(0, 200, n)) * np.select([morning, evening], [1.3, 1.2], 1.0)
+    
+    # Weekend vs Weekday patterns
+    usage_freq = np.where(day >= 5, usage_freq * 0.7, usage_freq)
+    
+    # Temperature variation (simulated)
+    temperature = 25 + 5 * np.sin(2 * np.pi * hour / 24) + rng.normal(0, 2, n)
+    
+    return pd.DataFrame({
+        'Timestamp': timestamps,
+        'Hour': hour,
+        'Day': day,
+        'Vibration_Level': base_vibration,
+        'Usage_Frequency': usage_freq,
+        'Temperature': temperature,
+        'Usage_Label': np.where(usage_freq > 0.6, 'High Usage', 'Low Usage')
+    })
+
+def generate_load_pattern_data_vectorized(n_samples=1000, rng=None):
+    """Array-based equivalent of generate_load_pattern_data"""
+    rng = rng if rng is not None else np.random.default_rng()
+    vibration = rng.choice([2000, 6000, 9000], n_samples) + rng.normal(0, 200, n_samples)
+    
+    # Correlate current and power with vibration, plus noise
+    current = vibration / 1000 + rng.normal(0, 0.5, n_samples)
+    power = vibration * 1.5 + rng.normal(0, 100, n_samples)
+    
+    load_type = np.select([vibration < 4000, vibration < 7000], ['Light Load', 'Normal Load'], 'Peak Load')
+    
+    return pd.DataFrame({
+        'Vibration_Level': vibration,
+        'Motor_Current': current,
+        'Power_Consumption': power,
+        'Load_Type': load_type
+    })
+
+def generate_start_stop_data_vectorized(n_samples=1000, rng=None, start_time=None):
+    """Array-based equivalent of generate_start_stop_data
+
+    The random walk restarts at every state change, so it is built from one
+    cumulative sum of the noise, rebased at the start of each segment.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    start_time = start_time if start_time is not None else datetime.now()
+    
+    # Simulate motor state changes (10% chance), otherwise drift from the previous level
+    state_change = rng.random(n_samples) < 0.1
+    restart_level = rng.choice([0, 2000, 6000], n_samples)  # Off, Normal, High
+    drift = np.where(state_change, 0.0, rng.normal(0, 100, n_samples))
+    
+    # Segment 0 continues from the initial level 0, segment k from the k-th state change
+    segment = np.cumsum(state_change)
+    changes = np.flatnonzero(state_change)
+    walk = np.cumsum(drift)
+    segment_level = np.concatenate([[0.0], restart_level[changes]])
+    segment_offset = np.concatenate([[0.0], walk[changes]])
+    vibration = segment_level[segment] + walk - segment_offset[segment]
+    
+    vibration_change = np.abs(np.diff(vibration, prepend=0.0))
+    
+    return pd.DataFrame({
+        'Timestamp': pd.Timestamp(start_time) + pd.to_timedelta(np.arange(n_samples), unit='m'),
+        'Vibration_Level': vibration,
+        'Vibration_Change': vibration_change,
+        'Motor_State': np.where(vibration > 100, 'Running', 'Stopped')
+    })
+
+def generate_speed_optimization_data_vectorized(n_samples=1000, rng=None):
+    """Array-based equivalent of generate_speed_optimization_data"""
+    rng = rng if rng is not None else np.random.default_rng()
+    flow_rate = rng.uniform(10, 100, n_samples)  # L/min
+    pressure = rng.uniform(1, 10, n_samples)  # Bar
+    
+    # Correlate power with flow and pressure
+    power = flow_rate * pressure * 10 + rng.normal(0, 100, n_samples)
+    
+    # Calculate optimal speed based on system demands
+    optimal_speed = (flow_rate + pressure * 5) * 10  # RPM
+    
+    return pd.DataFrame({
+        'Required_Flow_Rate': flow_rate,
+        'System_Pressure': pressure,
+        'Power_Consumption': power,
+        'Optimal_Speed': optimal_speed
+    })
+
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Generate synthetic data for pattern analysis")
+    parser.add_argument('--vectorized', action='store_true', help='use the array-based generators')
+    parser.add_argument('--days', type=int, default=30, help='days of usage pattern data')
+    parser.add_argument('--samples', type=int, default=1000, help='rows of load, start/stop and speed data')
+    parser.add_argument('--seed', type=int, help='seed for the vectorized generators')
+    args = parser.parse_args()
+    
     print("Generating synthetic data for pattern analysis...")
     
     # Create data directory
-    import os
     os.makedirs('data', exist_ok=True)
     
-    # Generate and save all datasets
-    usage_df = generate_usage_pattern_data()
-    usage_df.to_csv('data/vibration_usage_patterns.csv', index=False)
+    if args.vectorized:
+        rng = np.random.default_rng(args.seed)
+        usage_df = generate_usage_pattern_data_vectorized(args.days, rng=rng)
+        load_df = generate_load_pattern_data_vectorized(args.samples, rng=rng)
+        start_stop_df = generate_start_stop_data_vectorized(args.samples, rng=rng)
+        speed_df = generate_speed_optimization_data_vectorized(args.samples, rng=rng)
+    else:
+        usage_df = generate_usage_pattern_data(args.days)
+        load_df = generate_load_pattern_data(args.samples)
+        start_stop_df = generate_start_stop_data(args.samples)
+        speed_df = generate_speed_optimization_data(args.samples)
+    
+    # Save all datasets
+    save_dataset(usage_df, 'data/vibration_usage_patterns.csv')
     print("✅ Usage pattern data generated")
     
-    load_df = generate_load_pattern_data()
-    load_df.to_csv('data/vibration_load_patterns.csv', index=False)
+    save_dataset(load_df, 'data/vibration_load_patterns.csv')
     print("✅ Load pattern data generated")
     
-    start_stop_df = generate_start_stop_data()
-    start_stop_df.to_csv('data/motor_start_stop.csv', index=False)
+    save_dataset(start_stop_df, 'data/motor_start_stop.csv')
     print("✅ Start/Stop pattern data generated")
     
-    speed_df = generate_speed_optimization_data()
-    speed_df.to_csv('data/motor_speed_data.csv', index=False)
+    save_dataset(speed_df, 'data/motor_speed_data.csv')
     print("✅ Speed optimization data generated")
     
     print("\nAll datasets have been generated successfully!")
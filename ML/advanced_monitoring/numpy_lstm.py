@@ -0,0 +1,63 @@
+import numpy as np
+
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: np.exp(-np.logaddexp(0, -x)),  # 1 / (1 + e^-x) without overflow
+    'tanh': np.tanh,
+    'linear': lambda x: x
+}
+
+class NumpyLSTMModel:
+    """Pure-NumPy forward pass of the LSTM(units) -> Dense(1) usage model
+
+    Reads the weights written by train_pattern_models.export_usage_model_weights,
+    so serving does not need to import TensorFlow. window is the number of
+    timesteps the model was trained on; predict() rejects any other.
+    """
+
+    def __init__(self, kernel, recurrent_kernel, bias, dense_kernel, dense_bias,
+                 activation='tanh', recurrent_activation='sigmoid', dense_activation='sigmoid', window=1):
+        self.kernel = kernel.astype(np.float32)
+        self.recurrent_kernel = recurrent_kernel.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.dense_kernel = dense_kernel.astype(np.float32)
+        self.dense_bias = dense_bias.astype(np.float32)
+        self.units = recurrent_kernel.shape[0]
+        self.window = int(window)
+        self.activation = ACTIVATIONS[activation]
+        self.recurrent_activation = ACTIVATIONS[recurrent_activation]
+        self.dense_activation = ACTIVATIONS[dense_activation]
+
+    @classmethod
+    def load(cls, path):
+        """Load weights saved as .npz"""
+        with np.load(path) as weights:
+            return cls(
+                kernel=weights['kernel'],
+                recurrent_kernel=weights['recurrent_kernel'],
+                bias=weights['bias'],
+                dense_kernel=weights['dense_kernel'],
+                dense_bias=weights['dense_bias'],
+                activation=str(weights['activation']),
+                recurrent_activation=str(weights['recurrent_activation']),
+                dense_activation=str(weights['dense_activation']),
+                # Exports from before windowed training were one-step models
+                window=int(weights['window']) if 'window' in weights else 1
+            )
+
+    def predict(self, x):
+        """Same contract as the Keras model: (batch, timesteps, features) -> (batch, 1)"""
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 3 or x.shape[1] != self.window:
+            raise ValueError(f"Expected input of shape (batch, {self.window}, features), got {x.shape}")
+        h = np.zeros((len(x), self.units), dtype=np.float32)
+        c = np.zeros((len(x), self.units), dtype=np.float32)
+        # The input projection does not depend on the state, do all timesteps at once
+        projected = x @ self.kernel + self.bias
+        for t in range(x.shape[1]):
+            # Keras packs the gates as input, forget, cell, output
+            z = projected[:, t] + h @ self.recurrent_kernel
+            i, f, g, o = np.split(z, 4, axis=1)
+            c = self.recurrent_activation(f) * c + self.recurrent_activation(i) * self.activation(g)
+            h = self.recurrent_activation(o) * self.activation(c)
+        return self.dense_activation(h @ self.dense_kernel + self.dense_bias)
@@ -1,18 +1,128 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template
 from flask_cors import CORS
 import numpy as np
-import tensorflow as tf
 import joblib
 from datetime import datetime
 import json
+import os
+from collections import OrderedDict, namedtuple
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from metrics import CONTENT_TYPE, MetricsRegistry, batcher_collector, cache_collector
+from model_registry import ModelRegistry
+from serving import MicroBatcher, ResultCache, run_inference, serve
+from start_stop import StartStopDetector, parse_timestamps
+from usage_windows import USAGE_FEATURES
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS
 
-# Load all models
-usage_model = tf.keras.models.load_model("models/usage_prediction_model.h5")
-load_model = joblib.load("models/load_classification_model.pkl")
-speed_model = joblib.load("models/speed_optimization_model.pkl")
+# Models are loaded on first use and reloaded when their artifacts change
+models = ModelRegistry(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+
+# The served usage model: its forward pass and the window it was trained on
+UsageModel = namedtuple('UsageModel', ['predict', 'window'])
+
+def load_usage_numpy(path):
+    from numpy_lstm import NumpyLSTMModel
+    model = NumpyLSTMModel.load(path)
+    return UsageModel(model.predict, model.window)
+
+def load_usage_tf(path):
+    import tensorflow as tf
+    model = tf.keras.models.load_model(path)
+    graph = tf.function(
+        lambda x: model(x, training=False),
+        input_signature=[tf.TensorSpec(shape=model.input_shape, dtype=tf.float32)]
+    )
+    return UsageModel(lambda x: graph(x.astype(np.float32)).numpy(), model.input_shape[1])
+
+# The usage model runs on exported NumPy weights, TensorFlow is only imported
+# for the 'tf' backend or when no weights have been exported yet
+USAGE_BACKEND = os.environ.get('USAGE_MODEL_BACKEND', 'numpy')
+if USAGE_BACKEND == 'numpy':
+    models.register('usage', 'usage_prediction_model.npz', load_usage_numpy)
+    if not os.path.exists(models.path('usage')):
+        print("usage_prediction_model.npz not found, serving the usage model with TensorFlow")
+        USAGE_BACKEND = 'tf'
+if USAGE_BACKEND != 'numpy':
+    models.register('usage', 'usage_prediction_model.h5', load_usage_tf)
+models.register('load', 'load_classification_model.pkl', joblib.load)
+
+# The linear speed model is served from its coefficients unless
+# SPEED_MODEL_BACKEND=sklearn
+SPEED_BACKEND = os.environ.get('SPEED_MODEL_BACKEND', 'closed_form')
+MAX_SURFACE_POINTS = 250000
+
+def load_speed_closed_form(path):
+    from speed_model import ClosedFormSpeedModel
+    return ClosedFormSpeedModel.from_model(joblib.load(path))
+
+models.register('speed', 'speed_optimization_model.pkl',
+                joblib.load if SPEED_BACKEND == 'sklearn' else load_speed_closed_form)
+
+# Telemetry for /metrics: time per request stage and per model call, and
+# predictions by class; the batcher and cache stats are read at scrape time
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram('pattern_stage_seconds', 'Time spent in each request stage', ['stage'])
+INFERENCE_SECONDS = metrics.histogram('pattern_inference_seconds', 'Time per model call', ['model'])
+PREDICTIONS = metrics.class_counter('pattern_predictions_total', 'Predictions by class', ['model'])
+PARSE_TIME = STAGE_SECONDS.labels('parse')
+SERIALIZE_TIME = STAGE_SECONDS.labels('serialize')
+USAGE_TIME = INFERENCE_SECONDS.labels('usage')
+LOAD_TIME = INFERENCE_SECONDS.labels('load')
+SPEED_TIME = INFERENCE_SECONDS.labels('speed')
+USAGE_PREDICTIONS = PREDICTIONS.labels('usage', classes=['Low Usage', 'High Usage'])
+LOAD_PREDICTIONS = PREDICTIONS.labels('load', classes=[])  # Classes come from the loaded model
+
+def predict_usage_batch(x):
+    usage_model = models.get('usage')
+    with USAGE_TIME.time():
+        return usage_model.predict(x)
+
+# Concurrent /predict_usage calls share one forward pass
+usage_batcher = MicroBatcher(
+    predict_usage_batch,
+    max_batch_size=int(os.environ.get('USAGE_MAX_BATCH', 32)),
+    max_wait_ms=float(os.environ.get('USAGE_MAX_WAIT_MS', 2.0)),
+    name='usage-batcher'
+)
+
+# /predict_load and /predict_speed are pure functions of their inputs, the
+# Node proxies send the same few payloads over and over
+def result_cache():
+    return ResultCache(
+        max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 4096)),
+        ttl=float(os.environ.get('RESULT_CACHE_TTL', 300)),
+        decimals=int(os.environ.get('RESULT_CACHE_DECIMALS', 3))
+    )
+
+result_caches = {'load': result_cache(), 'speed': result_cache()}
+
+metrics.collector(batcher_collector({'usage': usage_batcher}))
+metrics.collector(cache_collector(result_caches))
+
+# Start/stop state per pump, fed incrementally by /analyze_start_stop; the
+# MAX_PUMPS most recently analyzed pumps are kept
+start_stop_detectors = OrderedDict()
+start_stop_lock = threading.Lock()
+MAX_PUMPS = int(os.environ.get('MAX_PUMPS', 256))
+START_STOP_LOOKBACK = float(os.environ.get('START_STOP_LOOKBACK', 86400))
+
+# Raw readings recorded by the monitoring app (ML/app.py) when both apps are
+# given the same HISTORY_DB; without it the fallback is off
+HISTORY_DB = os.environ.get('HISTORY_DB', '')
+_history = None
+
+def history_store():
+    """HistoryStore of the monitoring app, None until its database exists"""
+    global _history
+    if _history is None and HISTORY_DB and os.path.exists(HISTORY_DB):
+        from history_store import HistoryStore
+        _history = HistoryStore(HISTORY_DB)
+    return _history
 
 @app.route('/')
 def dashboard():
@@ -20,81 +130,231 @@ def dashboard():
 
 @app.route('/predict_usage', methods=['POST'])
 def predict_usage():
-    data = request.json
-    
-    # Extract features
-    features = np.array([[
-        float(data["Hour"]),
-        float(data["Day"]),
-        float(data["Vibration_Level"]),
-        float(data["Usage_Frequency"])
-    ]]).reshape(1, 1, 4)
+    with PARSE_TIME.time():
+        data = request.json
+        
+        # A windowed model needs exactly its training window of readings as
+        # "Sequence", oldest first; a single reading is a window of one
+        window = models.get('usage').window
+        readings = data["Sequence"] if "Sequence" in data else [data]
+        if not isinstance(readings, list) or len(readings) != window:
+            return jsonify({"error": f"The usage model takes a Sequence of exactly {window} readings"}), 400
+        
+        # Extract features
+        try:
+            features = np.array([[
+                [float(reading[name]) for name in USAGE_FEATURES]
+                for reading in readings
+            ]])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": f"Every reading needs numeric {', '.join(USAGE_FEATURES)}"}), 400
     
     # Make prediction
-    prediction = usage_model.predict(features)[0][0]
-    result = "High Usage" if prediction > 0.5 else "Low Usage"
+    prediction = usage_batcher.predict(features)[0][0]
+    high = prediction > 0.5
+    USAGE_PREDICTIONS.add_codes([high])
     
-    return jsonify({
-        "Usage_Pattern": result,
-        "Confidence": float(prediction)
-    })
+    with SERIALIZE_TIME.time():
+        return jsonify({
+            "Usage_Pattern": "High Usage" if high else "Low Usage",
+            "Confidence": float(prediction)
+        })
 
 @app.route('/predict_load', methods=['POST'])
 def predict_load():
-    data = request.json
-    
-    # Extract features
-    features = np.array([[
-        float(data["Vibration_Level"]),
-        float(data["Motor_Current"]),
-        float(data["Power_Consumption"])
-    ]])
+    with PARSE_TIME.time():
+        data = request.json
+        
+        # Extract features
+        features = np.array([[
+            float(data["Vibration_Level"]),
+            float(data["Motor_Current"]),
+            float(data["Power_Consumption"])
+        ]])
     
     # Make prediction
-    prediction = load_model.predict(features)[0]
-    proba = load_model.predict_proba(features)[0]
+    def compute(features):
+        load_model = models.get('load')
+        with LOAD_TIME.time():
+            prediction = run_inference(load_model.predict, features)[0]
+            proba = run_inference(load_model.predict_proba, features)[0]
+        return {
+            "Load_Type": prediction,
+            "Confidence": float(max(proba))
+        }
     
-    return jsonify({
-        "Load_Type": prediction,
-        "Confidence": float(max(proba))
-    })
+    result = result_caches['load'].get(models.stamp('load'), features, compute)
+    # Counted per response, cache hits included; a reloaded model may bring new classes
+    LOAD_PREDICTIONS.extend(models.get('load').classes_.tolist())
+    LOAD_PREDICTIONS.add_labels([result["Load_Type"]])
+    with SERIALIZE_TIME.time():
+        return jsonify(result)
 
 @app.route('/predict_speed', methods=['POST'])
 def predict_speed():
-    data = request.json
-    
-    # Extract features
-    features = np.array([[
-        float(data["Required_Flow_Rate"]),
-        float(data["System_Pressure"]),
-        float(data["Power_Consumption"])
-    ]])
+    with PARSE_TIME.time():
+        data = request.json
+        
+        # Extract features
+        features = np.array([[
+            float(data["Required_Flow_Rate"]),
+            float(data["System_Pressure"]),
+            float(data["Power_Consumption"])
+        ]])
     
     # Make prediction
-    prediction = speed_model.predict(features)[0]
+    def compute(features):
+        speed_model = models.get('speed')
+        with SPEED_TIME.time():
+            if SPEED_BACKEND == 'sklearn':
+                prediction = run_inference(speed_model.predict, features)[0]
+            else:
+                prediction = speed_model.predict(features)[0]
+        return {
+            "Optimal_Speed": float(prediction),
+            "Unit": "RPM"
+        }
+    
+    result = result_caches['speed'].get(models.stamp('speed'), features, compute)
+    with SERIALIZE_TIME.time():
+        return jsonify(result)
+
+def axis_length(spec):
+    """Number of grid values a list or {"start", "stop", "num"} object asks for"""
+    if isinstance(spec, dict):
+        num = spec.get("num", 50)
+        if isinstance(num, bool) or not isinstance(num, (int, float)) or not float(num).is_integer():
+            raise ValueError("num must be an integer")
+        return int(num)
+    if isinstance(spec, list) and not any(isinstance(value, (list, dict)) for value in spec):
+        return len(spec)
+    raise ValueError("Each axis must be a list of numbers or a {start, stop, num} object")
+
+def grid_axis(spec):
+    """Grid values from a list or a {"start", "stop", "num"} object"""
+    if isinstance(spec, dict):
+        return np.linspace(float(spec["start"]), float(spec["stop"]), axis_length(spec))
+    return np.asarray(spec, dtype=float).ravel()
+
+@app.route('/predict_speed_surface', methods=['POST'])
+def predict_speed_surface():
+    """Optimal speed over a flow x pressure operating envelope in one call
+
+    Power_Consumption is required, a scalar applied to the whole grid or a
+    nested list of the grid's shape.
+    """
+    data = request.json or {}
+    # Sizes are checked from the request before any grid is allocated
+    for name in ("Required_Flow_Rate", "System_Pressure"):
+        if data.get(name) is None:
+            return jsonify({"error": f"{name} is required"}), 400
+    try:
+        shape = (axis_length(data["Required_Flow_Rate"]), axis_length(data["System_Pressure"]))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if min(shape) <= 0:
+        return jsonify({"error": "Each axis needs at least one value"}), 400
+    if shape[0] * shape[1] > MAX_SURFACE_POINTS:
+        return jsonify({"error": f"Grid is limited to {MAX_SURFACE_POINTS} points"}), 400
+    if data.get("Power_Consumption") is None:
+        return jsonify({"error": "Power_Consumption is required"}), 400
+    try:
+        power = np.asarray(data["Power_Consumption"], dtype=float)
+        flow_rates = grid_axis(data["Required_Flow_Rate"])
+        pressures = grid_axis(data["System_Pressure"])
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid grid: {e}"}), 400
+    if power.ndim and power.shape != shape:
+        return jsonify({"error": f"Power_Consumption must be a scalar or a {shape[0]}x{shape[1]} grid"}), 400
+    
+    speed_model = models.get('speed')
+    if SPEED_BACKEND == 'sklearn':
+        from speed_model import ClosedFormSpeedModel
+        speed_model = ClosedFormSpeedModel.from_model(speed_model)
+    surface = speed_model.surface(flow_rates, pressures, power)
     
     return jsonify({
-        "Optimal_Speed": float(prediction),
+        "Required_Flow_Rate": flow_rates.tolist(),
+        "System_Pressure": pressures.tolist(),
+        "Optimal_Speed": surface.tolist(),
         "Unit": "RPM"
     })
 
 @app.route('/analyze_start_stop', methods=['POST'])
 def analyze_start_stop():
-    data = request.json
-    vibration_change = float(data["Vibration_Change"])
+    data = request.json or {}
+    pump_id = str(data.get("Pump_ID", "default"))
+    if "Vibration_Change" in data and "Vibration_Level" not in data:
+        # The old random-score endpoint took a single change value
+        return jsonify({"error": "Vibration_Change is no longer supported, send Vibration_Level "
+                                 "readings (and optionally Timestamp) instead"}), 400
+    
+    # Readings come with the request (a generate_start_stop_data-shaped series,
+    # epoch or ISO timestamps), or are the pump's new raw readings in the
+    # history database of the monitoring app
+    if "Vibration_Level" in data:
+        try:
+            vibrations = np.atleast_1d(np.asarray(data["Vibration_Level"], dtype=float))
+            timestamps = parse_timestamps(data.get("Timestamp"), len(vibrations))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "Vibration_Level must be numbers and Timestamp epoch "
+                                     "seconds/milliseconds or ISO 8601 strings"}), 400
+        if vibrations.ndim != 1 or not np.isfinite(vibrations).all():
+            return jsonify({"error": "Vibration_Level must be a number or a flat list of numbers"}), 400
+        if len(timestamps) != len(vibrations):
+            return jsonify({"error": "Timestamp and Vibration_Level lengths differ"}), 400
+    
+    with start_stop_lock:
+        if data.get("Reset") or pump_id not in start_stop_detectors:
+            start_stop_detectors[pump_id] = StartStopDetector()
+            while len(start_stop_detectors) > MAX_PUMPS:
+                start_stop_detectors.popitem(last=False)
+        start_stop_detectors.move_to_end(pump_id)
+        detector = start_stop_detectors[pump_id]
     
-    # Analyze start/stop frequency
-    if vibration_change > 50:
-        recommendation = "Reduce cycling frequency"
+    if "Vibration_Level" not in data:
+        store = history_store()
+        now = datetime.now().timestamp()
+        since = detector.last_time if detector.last_time is not None else now - START_STOP_LOOKBACK
+        timestamps, vibrations = store.vibration_series(pump_id, since, now) if store else ([], [])
+    
+    summary = detector.update(timestamps, vibrations)
+    if summary['samples'] == 0:
+        status, recommendation = "No Data", "No vibration readings for this pump yet"
+    elif summary['cycling']:
         status = "High"
+        recommendation = (f"Reduce cycling frequency: {summary['max_starts_per_hour']} starts within an hour, "
+                          f"limit {detector.max_starts_per_hour}")
     else:
-        recommendation = "Normal operation"
-        status = "Normal"
+        status, recommendation = "Normal", "Normal operation"
     
     return jsonify({
         "Start_Stop_Status": status,
-        "Recommendation": recommendation
+        "Recommendation": recommendation,
+        "Pump_ID": pump_id,
+        "Motor_State": summary['state'],
+        "Samples": summary['samples'],
+        "New_Starts": summary['new_starts'],
+        "New_Stops": summary['new_stops'],
+        "Total_Starts": summary['total_starts'],
+        "Starts_Last_Hour": summary['starts_last_hour'],
+        "Max_Starts_Per_Hour": summary['max_starts_per_hour'],
+        "Run_Fraction": summary['run_fraction'],
+        "Alerts": summary['alerts']
     })
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage and model call timings, prediction counts, batcher and cache stats"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route('/metrics/usage_batcher')
+def usage_batcher_metrics():
+    return jsonify(usage_batcher.metrics())
+
+@app.route('/metrics/result_cache')
+def result_cache_metrics():
+    return jsonify({name: cache.metrics() for name, cache in result_caches.items()})
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5051, debug=True)
+    serve(app, port=5051)
@@ -0,0 +1,33 @@
+import numpy as np
+
+SPEED_FEATURES = ['Required_Flow_Rate', 'System_Pressure', 'Power_Consumption']
+
+class ClosedFormSpeedModel:
+    """The speed LinearRegression reduced to its coefficients
+
+    predict() is X @ coef + intercept with none of scikit-learn's per-call
+    input validation, and surface() evaluates a whole flow x pressure grid
+    by broadcasting.
+    """
+
+    def __init__(self, coef, intercept):
+        self.coef = np.asarray(coef, dtype=float).ravel()
+        self.intercept = float(np.ravel(intercept)[0])
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(model.coef_, model.intercept_)
+
+    def predict(self, X):
+        """Optimal speed (RPM) for rows of SPEED_FEATURES"""
+        return np.asarray(X, dtype=float) @ self.coef + self.intercept
+
+    def surface(self, flow_rates, pressures, power):
+        """Optimal speed over a grid, shape (len(flow_rates), len(pressures))
+
+        power is a scalar or an array broadcastable to the grid.
+        """
+        flow = np.asarray(flow_rates, dtype=float)[:, None]
+        pressure = np.asarray(pressures, dtype=float)[None, :]
+        c_flow, c_pressure, c_power = self.coef
+        return c_flow * flow + c_pressure * pressure + c_power * np.asarray(power, dtype=float) + self.intercept
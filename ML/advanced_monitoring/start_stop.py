@@ -0,0 +1,147 @@
+import threading
+import time
+import numpy as np
+
+# A motor counts as started above ON_THRESHOLD and as stopped below
+# OFF_THRESHOLD; in between it keeps its last state, so noise around a
+# single cut-off (generate_start_stop_data labels Running above 100) does
+# not register as cycling
+ON_THRESHOLD = 150.0
+OFF_THRESHOLD = 50.0
+
+# Starts allowed in any rolling WINDOW_SECONDS before cycling is flagged
+MAX_STARTS_PER_HOUR = 6
+WINDOW_SECONDS = 3600.0
+
+def hysteresis_states(vibrations, on_threshold=ON_THRESHOLD, off_threshold=OFF_THRESHOLD, initial=0):
+    """Running (1) / Stopped (0) state after every sample, vectorized
+
+    Samples above on_threshold or below off_threshold decide the state;
+    every sample in the band between them takes the state of the last
+    deciding sample, found with a running maximum over their indices.
+    """
+    vibrations = np.asarray(vibrations, dtype=float)
+    decided = np.full(len(vibrations) + 1, -1, dtype=np.int8)
+    decided[0] = initial
+    decided[1:][vibrations > on_threshold] = 1
+    decided[1:][vibrations < off_threshold] = 0
+    last = np.where(decided >= 0, np.arange(len(decided)), 0)
+    np.maximum.accumulate(last, out=last)
+    return decided[last][1:]
+
+def transitions(states, initial=0):
+    """Indices of the samples where the motor started and where it stopped"""
+    change = np.diff(states, prepend=np.int8(initial))
+    return np.flatnonzero(change == 1), np.flatnonzero(change == -1)
+
+def rolling_counts(times, window=WINDOW_SECONDS, earlier=()):
+    """Events in (t - window, t] at each event time t, including the earlier ones"""
+    times = np.asarray(times, dtype=float)
+    all_times = np.concatenate([np.asarray(earlier, dtype=float), times])
+    first = np.searchsorted(all_times, times - window, side='right')
+    return np.arange(len(all_times) - len(times), len(all_times)) - first + 1
+
+def cycling_alerts(times, counts, limit=MAX_STARTS_PER_HOUR):
+    """Episodes of consecutive starts whose rolling count exceeds limit"""
+    edges = np.diff((np.asarray(counts) > limit).astype(np.int8), prepend=0, append=0)
+    return [
+        {'start': float(times[begin]), 'end': float(times[end - 1]),
+         'starts': int(end - begin), 'max_starts_per_hour': int(counts[begin:end].max())}
+        for begin, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+    ]
+
+def parse_timestamps(values, n, interval=60.0):
+    """Epoch seconds of n samples from epoch numbers (s or ms), ISO strings or nothing
+
+    Without timestamps the samples are taken to be `interval` seconds apart,
+    the one-minute spacing of generate_start_stop_data, ending now.
+    """
+    if values is None:
+        return time.time() - interval * np.arange(n - 1, -1, -1)
+    values = np.atleast_1d(values)
+    if values.dtype.kind in 'iuf':
+        values = values.astype(float)
+        return np.where(values > 1e11, values / 1000, values)  # ms epochs from the Node side
+    import pandas as pd
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[us]').astype(np.int64) / 1e6
+
+class StartStopDetector:
+    """Start/stop tracking of one pump, updated with batches of new samples
+
+    Keeps only the current state, the time of the last sample and the start
+    times inside the rolling window, so each update costs O(batch) whatever
+    the length of the history before it.
+    """
+
+    def __init__(self, on_threshold=ON_THRESHOLD, off_threshold=OFF_THRESHOLD,
+                 max_starts_per_hour=MAX_STARTS_PER_HOUR, window=WINDOW_SECONDS):
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.max_starts_per_hour = max_starts_per_hour
+        self.window = window
+        self.state = 0
+        self.last_time = None
+        self.recent_starts = np.empty(0)
+        self.samples = 0
+        self.starts = 0
+        self.stops = 0
+        self.running_seconds = 0.0
+        self.observed_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def update(self, timestamps, vibrations):
+        """Add samples (epoch seconds, any order), returns what they changed
+
+        Samples are put in time order first (stably, so equal timestamps keep
+        their order). Samples at or before the last one already seen are
+        skipped, so overlapping batches can be fed safely.
+        """
+        with self.lock:
+            times = np.asarray(timestamps, dtype=float)
+            vibrations = np.asarray(vibrations, dtype=float)
+            order = np.argsort(times, kind='stable')
+            times, vibrations = times[order], vibrations[order]
+            if self.last_time is not None:
+                new = times > self.last_time
+                times, vibrations = times[new], vibrations[new]
+            if len(times) == 0:
+                return self.summary(self.recent_starts[:0], np.empty(0, dtype=np.int64), [])
+
+            states = hysteresis_states(vibrations, self.on_threshold, self.off_threshold, self.state)
+            start_idx, stop_idx = transitions(states, self.state)
+            start_times = times[start_idx]
+            counts = rolling_counts(start_times, self.window, self.recent_starts)
+            alerts = cycling_alerts(start_times, counts, self.max_starts_per_hour)
+
+            # Time between consecutive samples counts toward the earlier one's state
+            previous_times = np.concatenate([[times[0] if self.last_time is None else self.last_time], times[:-1]])
+            previous_states = np.concatenate([[self.state], states[:-1]])
+            elapsed = times - previous_times
+            self.running_seconds += float(elapsed[previous_states == 1].sum())
+            self.observed_seconds += float(elapsed.sum())
+
+            self.state = int(states[-1])
+            self.last_time = float(times[-1])
+            self.samples += len(times)
+            self.starts += len(start_idx)
+            self.stops += len(stop_idx)
+            recent = np.concatenate([self.recent_starts, start_times])
+            self.recent_starts = recent[recent > self.last_time - self.window]
+            return self.summary(start_times, counts, alerts, len(stop_idx))
+
+    def summary(self, start_times, counts, alerts, stops=0):
+        starts_last_window = len(self.recent_starts)
+        return {
+            'state': 'Running' if self.state else 'Stopped',
+            'samples': self.samples,
+            'new_starts': len(start_times),
+            'new_stops': stops,
+            'total_starts': self.starts,
+            'total_stops': self.stops,
+            'starts_last_hour': starts_last_window,
+            'max_starts_per_hour': int(counts.max()) if len(counts) else starts_last_window,
+            'run_fraction': self.running_seconds / self.observed_seconds if self.observed_seconds else 0.0,
+            'alerts': alerts,
+            'cycling': bool(alerts) or starts_last_window > self.max_starts_per_hour,
+            'last_time': self.last_time
+        }
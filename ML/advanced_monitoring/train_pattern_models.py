@@ -8,48 +8,71 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
 import joblib
 import os
+import sys
 
-def train_usage_pattern_model():
-    """Train LSTM model for usage pattern prediction"""
-    print("\nTraining Usage Pattern Model...")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dataset_io import load_dataset
+from usage_windows import USAGE_FEATURES, USAGE_WINDOW, split_series, usage_series, window_dataset
+
+def train_usage_pattern_model(window=USAGE_WINDOW):
+    """Train LSTM model for usage pattern prediction over windows of `window` readings"""
+    print(f"\nTraining Usage Pattern Model (window of {window})...")
     
     # Load data
-    df = pd.read_csv("data/vibration_usage_patterns.csv")
-    
-    # Prepare features
-    X = df[['Hour', 'Day', 'Vibration_Level', 'Usage_Frequency']].values
-    y = (df['Usage_Label'] == 'High Usage').astype(int)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+    df = load_dataset("data/vibration_usage_patterns.csv",
+                      columns=['Timestamp'] + USAGE_FEATURES + ['Usage_Label'])
     
-    # Reshape for LSTM
-    X_train = X_train.reshape((X_train.shape[0], 1, X_train.shape[1]))
-    X_test = X_test.reshape((X_test.shape[0], 1, X_test.shape[1]))
+    # Time-ordered windows, the most recent 20% held out
+    X, y = usage_series(df)
+    (X_train, y_train), (X_test, y_test) = split_series(X, y, window)
+    train_data = window_dataset(X_train, y_train, window, batch_size=32, shuffle=True)
+    test_data = window_dataset(X_test, y_test, window, batch_size=32)
     
     # Create model
     model = Sequential([
-        LSTM(50, activation='relu', input_shape=(1, X_train.shape[2])),
+        LSTM(50, activation='relu', input_shape=(window, X.shape[1])),
         Dense(1, activation='sigmoid')
     ])
     
     # Compile and train
     model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-    history = model.fit(X_train, y_train, epochs=20, batch_size=32, validation_data=(X_test, y_test))
+    history = model.fit(train_data, epochs=20, validation_data=test_data)
     
     # Save model
     model.save("models/usage_prediction_model.h5")
+    export_usage_model_weights(model)
     
     # Evaluate
-    _, accuracy = model.evaluate(X_test, y_test)
+    _, accuracy = model.evaluate(test_data)
     print(f"Usage Pattern Model Accuracy: {accuracy:.2f}")
 
+def export_usage_model_weights(model, path="models/usage_prediction_model.npz"):
+    """Export the LSTM and Dense weights for the NumPy serving backend"""
+    lstm, dense = model.layers
+    lstm_config, dense_config = lstm.get_config(), dense.get_config()
+    kernel, recurrent_kernel, bias = lstm.get_weights()
+    dense_kernel, dense_bias = dense.get_weights()
+    np.savez(
+        path,
+        kernel=kernel,
+        recurrent_kernel=recurrent_kernel,
+        bias=bias,
+        dense_kernel=dense_kernel,
+        dense_bias=dense_bias,
+        activation=lstm_config['activation'],
+        recurrent_activation=lstm_config['recurrent_activation'],
+        dense_activation=dense_config['activation'],
+        window=model.input_shape[1]  # Timesteps the model was trained on
+    )
+    print(f"Usage model weights exported to {path}")
+
 def train_load_pattern_model():
     """Train Random Forest for load classification"""
     print("\nTraining Load Pattern Model...")
     
     # Load data
-    df = pd.read_csv("data/vibration_load_patterns.csv")
+    df = load_dataset("data/vibration_load_patterns.csv",
+                      columns=['Vibration_Level', 'Motor_Current', 'Power_Consumption', 'Load_Type'])
     
     # Prepare features
     X = df[['Vibration_Level', 'Motor_Current', 'Power_Consumption']].values
@@ -74,7 +97,7 @@ def train_speed_optimization_model():
     print("\nTraining Speed Optimization Model...")
     
     # Load data
-    df = pd.read_csv("data/motor_speed_data.csv")
+    df = load_dataset("data/motor_speed_data.csv")
     
     # Prepare features
     X = df[['Required_Flow_Rate', 'System_Pressure', 'Power_Consumption']].values
@@ -98,11 +121,22 @@ if __name__ == "__main__":
     # Create models directory
     os.makedirs('models', exist_ok=True)
     
+    # Re-export the weights of an already trained usage model without retraining
+    if '--export-usage' in sys.argv:
+        export_usage_model_weights(tf.keras.models.load_model("models/usage_prediction_model.h5"))
+        sys.exit(0)
+    
     print("Training all pattern analysis models...")
     
     # Train all models
     train_usage_pattern_model()
-    train_load_pattern_model()
+    if '--stream' in sys.argv:
+        # Grow the forest chunk by chunk instead of loading the dataset whole
+        from stream_train import train_streaming
+        _, accuracy = train_streaming('load')
+        print(f"Load Pattern Model Accuracy (streamed): {accuracy:.2f}")
+    else:
+        train_load_pattern_model()
     train_speed_optimization_model()
     
     print("\n✅ All models trained and saved successfully!")
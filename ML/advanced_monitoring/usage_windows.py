@@ -0,0 +1,75 @@
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+USAGE_FEATURES = ['Hour', 'Day', 'Vibration_Level', 'Usage_Frequency']
+
+# Timesteps the usage LSTM is trained to see per prediction. The data is
+# sampled every 30 minutes, so 48 covers a day and 336 a week; 1 is the
+# original one-row model the Node proxy sends single readings to. Serving
+# and batch scoring take the window from the trained model, not from here.
+USAGE_WINDOW = int(os.environ.get('USAGE_WINDOW', 1))
+
+def usage_series(df):
+    """(X, y) of the usage data in time order, X as float32 rows of USAGE_FEATURES"""
+    if 'Timestamp' in df.columns:
+        df = df.sort_values('Timestamp', kind='stable')
+    X = np.ascontiguousarray(df[USAGE_FEATURES].to_numpy(dtype=np.float32))
+    y = (df['Usage_Label'] == 'High Usage').to_numpy(dtype=np.int64) if 'Usage_Label' in df.columns else None
+    return X, y
+
+def sliding_windows(X, window):
+    """Every run of `window` consecutive rows, shape (n - window + 1, window, features)
+
+    A strided view of X, nothing is copied.
+    """
+    return sliding_window_view(X, window, axis=0).transpose(0, 2, 1)
+
+def window_targets(y, window):
+    """Label of each window, that of its last row"""
+    return y[window - 1:]
+
+def window_dataset(X, y=None, window=USAGE_WINDOW, batch_size=32, shuffle=False, seed=42):
+    """tf.data pipeline of (window, label) batches over X
+
+    Only window indices go through shuffle and batch; each batch is gathered
+    from the strided view when it is consumed, so at most a few batches of
+    windows exist in memory at a time, however long the window.
+    """
+    import tensorflow as tf
+
+    windows = sliding_windows(X, window)
+    targets = None if y is None else window_targets(np.asarray(y), window).astype(np.float32)
+    n_features = X.shape[1]
+
+    def gather(indices):
+        batch = windows[indices]
+        return batch if targets is None else (batch, targets[indices])
+
+    out_types = tf.float32 if targets is None else (tf.float32, tf.float32)
+    dataset = tf.data.Dataset.range(len(windows))
+    if shuffle:
+        dataset = dataset.shuffle(len(windows), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(
+        lambda indices: tf.numpy_function(gather, [indices], out_types),
+        num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+
+    def set_shapes(*batch):
+        batch[0].set_shape([None, window, n_features])
+        if targets is not None:
+            batch[1].set_shape([None])
+        return batch if targets is not None else batch[0]
+
+    return dataset.map(set_shapes).prefetch(tf.data.AUTOTUNE)
+
+def split_series(X, y, window, test_size=0.2):
+    """Time-ordered split: the last test_size of the windows are held out
+
+    Test windows may start in the training rows, but no training window
+    contains a test row's label.
+    """
+    n_windows = len(X) - window + 1
+    n_train = int(n_windows * (1 - test_size))
+    train = (X[:n_train + window - 1], y[:n_train + window - 1])
+    test = (X[n_train:], y[n_train:])
+    return train, test
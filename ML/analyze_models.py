@@ -6,40 +6,45 @@ from sklearn.metrics import confusion_matrix, roc_curve, auc
 import joblib
 from sklearn.model_selection import train_test_split
 import os
-
-# Create directories for plots
-os.makedirs('plots', exist_ok=True)
-os.makedirs('plots/vibration', exist_ok=True)
-os.makedirs('plots/cooling', exist_ok=True)
+from artifact_cache import cached_dataset, cached_model
 
 # Set style
 sns.set_theme(style="whitegrid")
 
-# Load data and models
-print("Loading data and models...")
-data = pd.read_csv('data/vibration_data.csv')
-vibration_model = joblib.load('models/vibration_model.joblib')
-cooling_model = joblib.load('models/cooling_model.joblib')
-
-# Prepare features
-X_vibration = data[['vibration']].values
-y_vibration = data['label'].values
+PLOT_DIRS = ['plots', 'plots/vibration', 'plots/cooling']
 
 cooling_features = ['vibration', 'peak_vibration', 'stable_vibration', 
                    'cooling_duration', 'vibration_reduction', 'avg_vibration']
-X_cooling = data[cooling_features].values
-y_cooling = (data['cooling_efficiency'] == 'Efficient').astype(int)
 
-# Split data
-X_vib_train, X_vib_test, y_vib_train, y_vib_test = train_test_split(
-    X_vibration, y_vibration, test_size=0.2, random_state=42
-)
-X_cool_train, X_cool_test, y_cool_train, y_cool_test = train_test_split(
-    X_cooling, y_cooling, test_size=0.2, random_state=42
-)
+# Data and models are loaded on first use and shared through the artifact
+# cache, so importing this module (e.g. in a plot worker) stays cheap
+def load_data():
+    return cached_dataset('data/vibration_data.csv',
+                          columns=cooling_features + ['label', 'condition', 'cooling_efficiency'])
+
+def load_models():
+    return (cached_model('models/vibration_model.joblib'),
+            cached_model('models/cooling_model.joblib'))
+
+def test_split(data):
+    """Held-out rows of both models (X_vib_test, y_vib_test, X_cool_test, y_cool_test)"""
+    X_vibration = data[['vibration']].values
+    y_vibration = data['label'].values
+
+    X_cooling = data[cooling_features].values
+    y_cooling = (data['cooling_efficiency'] == 'Efficient').astype(int)
+
+    _, X_vib_test, _, y_vib_test = train_test_split(
+        X_vibration, y_vibration, test_size=0.2, random_state=42
+    )
+    _, X_cool_test, _, y_cool_test = train_test_split(
+        X_cooling, y_cooling, test_size=0.2, random_state=42
+    )
+    return X_vib_test, y_vib_test, X_cool_test, y_cool_test
 
 def plot_vibration_distribution():
     """Plot vibration distribution by motor status"""
+    data = load_data()
     plt.figure(figsize=(12, 6))
     sns.boxplot(x='condition', y='vibration', data=data)
     plt.title('Vibration Distribution by Motor Status')
@@ -50,6 +55,7 @@ def plot_vibration_distribution():
 
 def plot_cooling_efficiency():
     """Plot cooling efficiency metrics"""
+    data = load_data()
     fig, axes = plt.subplots(2, 1, figsize=(12, 12))
     
     # Reduction percentage by condition
@@ -70,6 +76,8 @@ def plot_cooling_efficiency():
 
 def plot_vibration_confusion_matrix():
     """Plot confusion matrix for vibration model"""
+    vibration_model, _ = load_models()
+    X_vib_test, y_vib_test, _, _ = test_split(load_data())
     y_pred = vibration_model.predict(X_vib_test)
     cm = confusion_matrix(y_vib_test, y_pred)
     
@@ -85,6 +93,8 @@ def plot_vibration_confusion_matrix():
 
 def plot_cooling_confusion_matrix():
     """Plot confusion matrix for cooling model"""
+    _, cooling_model = load_models()
+    _, _, X_cool_test, y_cool_test = test_split(load_data())
     y_pred = cooling_model.predict(X_cool_test)
     cm = confusion_matrix(y_cool_test, y_pred)
     
@@ -100,6 +110,7 @@ def plot_cooling_confusion_matrix():
 
 def plot_feature_importance():
     """Plot feature importance for both models"""
+    vibration_model, cooling_model = load_models()
     fig, axes = plt.subplots(2, 1, figsize=(12, 12))
     
     # Vibration model
@@ -119,6 +130,7 @@ def plot_feature_importance():
 
 def plot_cooling_correlation():
     """Plot correlation matrix for cooling features"""
+    data = load_data()
     # Convert cooling efficiency to numeric
     cooling_data = data[cooling_features].copy()
     cooling_data['efficiency_numeric'] = (data['cooling_efficiency'] == 'Efficient').astype(int)
@@ -134,7 +146,7 @@ def plot_cooling_correlation():
 
 def plot_time_series():
     """Plot simulated time series data"""
-    sample_data = data.head(50)
+    sample_data = load_data().head(50)
     
     fig, axes = plt.subplots(2, 1, figsize=(15, 10))
     
@@ -159,6 +171,8 @@ def plot_time_series():
 
 def plot_roc_curves():
     """Plot ROC curves for both models"""
+    vibration_model, cooling_model = load_models()
+    X_vib_test, y_vib_test, X_cool_test, y_cool_test = test_split(load_data())
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
     
     # Vibration model (multi-class)
@@ -190,6 +204,8 @@ def plot_roc_curves():
     plt.close()
 
 if __name__ == "__main__":
+    for directory in PLOT_DIRS:
+        os.makedirs(directory, exist_ok=True)
     print("Generating plots...")
     
     try:
@@ -1,104 +1,354 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
 import joblib
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timezone
 import os
+from history_store import RESOLUTIONS, HistoryStore
+from metrics import CONTENT_TYPE, MetricsRegistry
+from model_registry import ModelRegistry
+from pump_state import PumpStateStore
+from sensor_stream import parse_timestamp
+from serving import run_inference, serve
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Load models
-vibration_model = joblib.load('models/vibration_model.joblib')
-cooling_model = joblib.load('models/cooling_model.joblib')
+# Models are loaded on first use and reloaded when their artifacts change
+models = ModelRegistry(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
 
-# Load cooling features
-with open('models/cooling_features.txt', 'r') as f:
-    cooling_features = f.read().splitlines()
+# Optionally swap the XGBClassifier wrappers for the flat NumPy tree engine,
+# 'lookup' additionally tabulates the single-feature vibration model
+INFERENCE_ENGINE = os.environ.get('ML_INFERENCE_ENGINE', 'xgboost')
 
-# Initialize history
-vibration_history = []
-cooling_history = []
-status_counts = {'Normal': 0, 'Overheating': 0, 'Failure': 0}
-cooling_counts = {'Efficient': 0, 'Inefficient': 0}
+def load_vibration_model(path):
+    model = joblib.load(path)
+    if INFERENCE_ENGINE == 'lookup':
+        from tree_engine import ThresholdLookup, check_lookup
+        lookup = ThresholdLookup.from_model(model)
+        if check_lookup(model, lookup):
+            raise RuntimeError("Vibration lookup table disagrees with the trained model")
+        return lookup
+    if INFERENCE_ENGINE == 'native':
+        from tree_engine import CompiledTrees
+        return CompiledTrees.from_model(model)
+    return model
 
-@app.route('/')
-def dashboard():
-    return render_template('dashboard.html')
+def load_cooling_model(path):
+    model = joblib.load(path)
+    if INFERENCE_ENGINE in ('native', 'lookup'):
+        from tree_engine import CompiledTrees
+        return CompiledTrees.from_model(model)
+    return model
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    data = request.get_json()
-    vibration = float(data['vibration'])
+def load_feature_names(path):
+    with open(path, 'r') as f:
+        return f.read().splitlines()
+
+models.register('vibration', 'vibration_model.joblib', load_vibration_model)
+models.register('cooling', 'cooling_model.joblib', load_cooling_model)
+models.register('cooling_features', 'cooling_features.txt', load_feature_names)
+
+STATUS_LABELS = np.array(['Normal', 'Overheating', 'Failure'])
+COOLING_LABELS = np.array(['Efficient', 'Inefficient'])
+HISTORY_SIZE = 10  # Readings returned with each response
+
+# Telemetry for /metrics: time per request stage and per model call, and
+# predictions by class. Pump ids come from requests, so they are not a label.
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram('ml_stage_seconds', 'Time spent in each request stage', ['stage'])
+INFERENCE_SECONDS = metrics.histogram('ml_inference_seconds', 'Time per model call', ['model'])
+PREDICTIONS = metrics.class_counter('ml_predictions_total', 'Predictions by class', ['model'])
+PARSE_TIME = STAGE_SECONDS.labels('parse')
+FEATURES_TIME = STAGE_SECONDS.labels('features')
+RECORD_TIME = STAGE_SECONDS.labels('record')
+SERIALIZE_TIME = STAGE_SECONDS.labels('serialize')
+VIBRATION_TIME = INFERENCE_SECONDS.labels('vibration')
+COOLING_TIME = INFERENCE_SECONDS.labels('cooling')
+VIBRATION_PREDICTIONS = PREDICTIONS.labels('vibration', classes=STATUS_LABELS.tolist())
+COOLING_PREDICTIONS = PREDICTIONS.labels('cooling', classes=COOLING_LABELS.tolist())
+
+# Per-pump history in preallocated ring buffers, HISTORY_LENGTH readings each,
+# for the MAX_PUMPS most recently seen pumps
+pump_states = PumpStateStore(int(os.environ.get('HISTORY_LENGTH', 4096)),
+                             max_pumps=int(os.environ.get('MAX_PUMPS', 256)))
+DEFAULT_PUMP = 'default'
+
+# Readings and predictions are also persisted with 1m/1h/1d rollups for
+# /history when HISTORY_DB names a database file (off by default). Raw
+# readings are kept for HISTORY_RETENTION seconds (0: forever), rollups for good.
+HISTORY_DB = os.environ.get('HISTORY_DB', '')
+HISTORY_RETENTION = float(os.environ.get('HISTORY_RETENTION', 7 * 86400))
+history = HistoryStore(HISTORY_DB, retention=HISTORY_RETENTION or None) if HISTORY_DB else None
+
+# With COOLING_FEATURES=stream the cooling features are computed online from
+# each pump's readings (those posted here plus MQTT_BROKER_URL or a
+# SENSOR_REPLAY recording) instead of being simulated from one reading
+cooling_stream = None
+if os.environ.get('COOLING_FEATURES') == 'stream':
+    from sensor_stream import CoolingFeatureStream, start_ingest
+    cooling_stream = CoolingFeatureStream(max_pumps=pump_states.max_pumps)
+    start_ingest(cooling_stream, os.environ.get('MQTT_BROKER_URL'), os.environ.get('SENSOR_REPLAY'))
+
+def simulated_cooling_features(vibrations):
+    """Cooling cycle features guessed from single readings"""
+    peak_vibration = vibrations * 1.1  # Simulated peak
+    stable_vibration = vibrations * 0.7  # Simulated stable state
+    return {
+        'vibration': vibrations,
+        'peak_vibration': peak_vibration,
+        'stable_vibration': stable_vibration,
+        'cooling_duration': np.random.uniform(15, 30, len(vibrations)),  # Minutes
+        'vibration_reduction': (peak_vibration - stable_vibration) / peak_vibration,
+        'avg_vibration': (peak_vibration + stable_vibration) / 2
+    }
+
+def score_readings(vibrations, pump_ids=None, timestamps=None):
+    """Run both models over an array of vibration readings in one pass each
+
+    timestamps (epoch seconds, default now) place the readings in their
+    pump's cooling cycle when the features come from the stream.
+    """
+    vibrations = np.asarray(vibrations, dtype=float)
+    n = len(vibrations)
     
-    # Simulate cooling cycle data
-    peak_vibration = vibration * 1.1  # Simulated peak
-    stable_vibration = vibration * 0.7  # Simulated stable state
-    cooling_duration = np.random.uniform(15, 30)  # Minutes
-    vibration_reduction = (peak_vibration - stable_vibration) / peak_vibration
-    avg_vibration = (peak_vibration + stable_vibration) / 2
+    with FEATURES_TIME.time():
+        if cooling_stream is not None:
+            pump_ids = [DEFAULT_PUMP] * n if pump_ids is None else pump_ids
+            timestamps = np.full(n, datetime.now().timestamp()) if timestamps is None else timestamps
+            cooling_columns = cooling_stream.update_many(pump_ids, timestamps, vibrations)
+        else:
+            cooling_columns = simulated_cooling_features(vibrations)
+    stable_vibration = cooling_columns['stable_vibration']
+    cooling_duration = cooling_columns['cooling_duration']
+    vibration_reduction = cooling_columns['vibration_reduction']
     
-    # Make predictions
-    vibration_pred = int(vibration_model.predict([[vibration]])[0])
-    cooling_features_values = [[vibration, peak_vibration, stable_vibration,
-                              cooling_duration, vibration_reduction, avg_vibration]]
-    cooling_pred = bool(cooling_model.predict(cooling_features_values)[0])
+    # Make predictions, one call per model for the whole batch
+    # Models are fetched (and loaded on first use) outside the timers
+    vibration_model, cooling_model = models.get('vibration'), models.get('cooling')
+    with VIBRATION_TIME.time():
+        vibration_pred = run_inference(vibration_model.predict, vibrations.reshape(-1, 1)).astype(int)
+    # Column order follows the feature list saved next to the model
+    cooling_matrix = np.column_stack([cooling_columns[name] for name in models.get('cooling_features')])
+    with COOLING_TIME.time():
+        cooling_pred = run_inference(cooling_model.predict, cooling_matrix).astype(bool)
     
     # Convert predictions to labels
-    status_map = {0: 'Normal', 1: 'Overheating', 2: 'Failure'}
-    status = status_map[vibration_pred]
+    status = STATUS_LABELS[vibration_pred]
     
     # Determine cooling efficiency based on reduction percentage
-    cooling_status = 'Efficient'
-    if vibration_reduction < 0.25:  # If reduction is less than 25%
-        cooling_status = 'Inefficient'
-    elif status == 'Overheating' and vibration_reduction < 0.3:  # Higher threshold for overheating
-        cooling_status = 'Inefficient'
-    elif status == 'Failure':  # Always inefficient in failure state
-        cooling_status = 'Inefficient'
-    
-    # Update counts
-    status_counts[status] += 1
-    cooling_counts[cooling_status] += 1
+    inefficient = ((vibration_reduction < 0.25)  # If reduction is less than 25%
+                   | ((status == 'Overheating') & (vibration_reduction < 0.3))  # Higher threshold for overheating
+                   | (status == 'Failure'))  # Always inefficient in failure state
+    cooling_status = np.where(inefficient, 'Inefficient', 'Efficient')
     
     # Calculate health score (0-100)
-    health_score = max(0, min(100, 100 - (vibration / 100)))
-    
-    # Update history
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    vibration_history.append({'time': timestamp, 'value': vibration, 'status': status})
-    cooling_history.append({
-        'time': timestamp,
-        'status': cooling_status,
-        'duration': round(cooling_duration, 1),
-        'reduction': round(vibration_reduction * 100, 1)
-    })
-    
-    # Keep only last 10 records
-    if len(vibration_history) > 10:
-        vibration_history.pop(0)
-    if len(cooling_history) > 10:
-        cooling_history.pop(0)
+    health_score = np.clip(100 - (vibrations / 100), 0, 100)
     
-    return jsonify({
+    return {
+        'vibration': vibrations,
+        'status_code': vibration_pred,
         'status': status,
+        'inefficient': inefficient,
         'cooling_status': cooling_status,
-        'vibration': vibration,
-        'health_score': round(health_score, 1),
-        'cooling_metrics': {
-            'duration': round(cooling_duration, 1),
-            'reduction': round(vibration_reduction * 100, 1),
-            'stable_vibration': round(stable_vibration, 1)
-        },
+        'cooling_pred': cooling_pred,
+        'health_score': health_score,
+        'cooling_duration': cooling_duration,
+        'vibration_reduction': vibration_reduction,
+        'stable_vibration': stable_vibration
+    }
+
+def record_results(pump_ids, scores):
+    """Append scored readings to the state of each pump they belong to
+
+    Returns {pump_id: PumpState} of the states written, for pump_summary;
+    looking them up again could find them already evicted.
+    """
+    timestamp = datetime.now().timestamp()
+    pumps, groups = np.unique(np.asarray(pump_ids, dtype=object), return_inverse=True)
+    states = {}
+    for i, pump_id in enumerate(pumps):
+        rows = groups == i
+        state = states[pump_id] = pump_states.get(pump_id)
+        state.record(
+            timestamp,
+            scores['vibration'][rows],
+            scores['status_code'][rows],
+            scores['inefficient'][rows],
+            scores['cooling_duration'][rows],
+            scores['vibration_reduction'][rows]
+        )
+    VIBRATION_PREDICTIONS.add_codes(scores['status_code'])
+    COOLING_PREDICTIONS.add_codes(scores['inefficient'])
+    if history is not None:
+        history.insert(pump_ids, np.full(len(pump_ids), timestamp), scores['vibration'],
+                       scores['status_code'], scores['inefficient'], scores['vibration_reduction'])
+    return states
+
+def pump_summary(state):
+    """Recent history and counts of a PumpState, in the /predict response layout"""
+    vibration, cooling, status_counts, cooling_counts = \
+        state.snapshot(HISTORY_SIZE, 3)  # Last 3 cooling events
+    return {
         'history': {
-            'vibration': vibration_history,
-            'cooling': cooling_history[-3:]  # Last 3 cooling events
+            'vibration': [
+                {
+                    'time': datetime.fromtimestamp(record['time']).strftime('%H:%M:%S'),
+                    'value': float(record['value']),
+                    'status': str(STATUS_LABELS[record['status']])
+                }
+                for record in vibration
+            ],
+            'cooling': [
+                {
+                    'time': datetime.fromtimestamp(record['time']).strftime('%H:%M:%S'),
+                    'status': str(COOLING_LABELS[int(record['inefficient'])]),
+                    'duration': round(float(record['duration']), 1),
+                    'reduction': round(float(record['reduction']) * 100, 1)
+                }
+                for record in cooling
+            ]
         },
         'counts': {
-            'status': status_counts,
-            'cooling': cooling_counts
+            'status': dict(zip(STATUS_LABELS.tolist(), status_counts.tolist())),
+            'cooling': dict(zip(COOLING_LABELS.tolist(), cooling_counts.tolist()))
         }
+    }
+
+def format_result(scores, i):
+    """Build the per-reading part of a prediction response"""
+    return {
+        'status': str(scores['status'][i]),
+        'cooling_status': str(scores['cooling_status'][i]),
+        'vibration': float(scores['vibration'][i]),
+        'health_score': round(float(scores['health_score'][i]), 1),
+        'cooling_metrics': {
+            'duration': round(float(scores['cooling_duration'][i]), 1),
+            'reduction': round(float(scores['vibration_reduction'][i]) * 100, 1),
+            'stable_vibration': round(float(scores['stable_vibration'][i]), 1)
+        }
+    }
+
+@app.route('/')
+def dashboard():
+    return render_template('dashboard.html')
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    with PARSE_TIME.time():
+        data = request.get_json()
+        vibration = float(data['vibration'])
+        pump_id = str(data.get('pump_id', DEFAULT_PUMP))
+        try:
+            timestamp = parse_timestamp(data.get('timestamp'))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'timestamp must be epoch seconds/milliseconds or ISO 8601'}), 400
+    
+    scores = score_readings([vibration], [pump_id], [timestamp])
+    with RECORD_TIME.time():
+        states = record_results([pump_id], scores)
+    
+    with SERIALIZE_TIME.time():
+        result = format_result(scores, 0)
+        result.update(pump_summary(states[pump_id]))
+        return jsonify(result)
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    with PARSE_TIME.time():
+        data = request.get_json(silent=True)
+        # Accept either bare numbers or {"vibration": ..., "pump_id": ..., "timestamp": ...}
+        # objects; readings without a pump_id belong to the request's pump_id,
+        # readings without a timestamp are taken at arrival
+        readings = data.get('readings') if isinstance(data, dict) else None
+        if not isinstance(readings, list):
+            return jsonify({'error': 'readings must be a list'}), 400
+        if not readings:
+            return jsonify({'error': 'readings must not be empty'}), 400
+        default_pump = str(data.get('pump_id', DEFAULT_PUMP))
+        try:
+            vibrations = [float(r['vibration']) if isinstance(r, dict) else float(r) for r in readings]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'every reading needs a numeric vibration'}), 400
+        pump_ids = [str(r.get('pump_id', default_pump)) if isinstance(r, dict) else default_pump
+                    for r in readings]
+        arrival = datetime.now().timestamp()
+        try:
+            timestamps = [parse_timestamp(r['timestamp']) if isinstance(r, dict) and r.get('timestamp') is not None
+                          else arrival for r in readings]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'timestamp must be epoch seconds/milliseconds or ISO 8601'}), 400
+        # More pumps than the store holds would evict this batch's own states
+        if len(set(pump_ids)) > pump_states.max_pumps:
+            return jsonify({'error': f'a batch may cover at most {pump_states.max_pumps} pumps'}), 400
+    
+    scores = score_readings(vibrations, pump_ids, timestamps)
+    with RECORD_TIME.time():
+        states = record_results(pump_ids, scores)
+    
+    with SERIALIZE_TIME.time():
+        results = [format_result(scores, i) for i in range(len(vibrations))]
+        for result, pump_id in zip(results, pump_ids):
+            result['pump_id'] = pump_id
+        return jsonify({
+            'results': results,
+            'pumps': {pump_id: pump_summary(state) for pump_id, state in states.items()}
+        })
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage timings, model call timings and prediction counts, Prometheus text format"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+def parse_time(value, default):
+    """Epoch seconds from a query parameter given as epoch seconds or ISO 8601 (UTC unless zoned)"""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+def utc_iso(epoch):
+    """ISO 8601 in UTC, the zone the history buckets are aligned to"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+@app.route('/history')
+def pump_history():
+    """Vibration history of a pump between from and to (default: the last day)
+
+    resolution is one of the rollup tiers (1m, 1h, 1d) or raw; without it
+    the finest tier giving at most 1000 points is used.
+    """
+    if history is None:
+        return jsonify({'error': 'history is disabled, set HISTORY_DB to enable it'}), 404
+    pump_id = request.args.get('pump', DEFAULT_PUMP)
+    try:
+        end = parse_time(request.args.get('to'), datetime.now().timestamp())
+        start = parse_time(request.args.get('from'), end - 86400)
+    except ValueError:
+        return jsonify({'error': 'from/to must be epoch seconds or ISO 8601'}), 400
+    resolution = request.args.get('resolution') or history.pick_resolution(start, end)
+    
+    if resolution == 'raw':
+        points = history.query_raw(pump_id, start, end)
+        for point in points:
+            point['status'] = str(STATUS_LABELS[point['status']])
+    elif resolution in RESOLUTIONS:
+        points = history.query(pump_id, start, end, resolution)
+    else:
+        return jsonify({'error': f"resolution must be raw or one of {', '.join(RESOLUTIONS)}"}), 400
+    for point in points:
+        point['time'] = utc_iso(point['time'])
+    
+    return jsonify({
+        'pump_id': pump_id,
+        'resolution': resolution,
+        'from': utc_iso(start),
+        'to': utc_iso(end),
+        'points': points
     })
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5050, debug=True)
+    serve(app, port=5050)
@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import OrderedDict
+import joblib
+from dataset_io import dataset_paths, load_dataset
+
+class ArtifactCache:
+    """Process-wide LRU memo of loaded artifacts, keyed by path and file stamp
+
+    An entry is only reused while the (mtime, size) of its files is unchanged,
+    so a rewritten dataset or model is picked up on the next call. At most
+    max_entries artifacts are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stamp(paths):
+        """(path, mtime_ns, size) of every existing file in paths"""
+        stamps = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+    def get(self, key, paths, loader):
+        """Return the cached artifact for key, calling loader() if its files changed"""
+        stamp = self.stamp(paths)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        self.put(key, value, stamp=stamp)
+        return value
+
+    def put(self, key, value, paths=(), stamp=None):
+        """Store an artifact that was loaded elsewhere, valid while paths are unchanged"""
+        stamp = self.stamp(paths) if stamp is None else stamp
+        with self.lock:
+            self.entries[key] = (stamp, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+cache = ArtifactCache(int(os.environ.get('ARTIFACT_CACHE_SIZE', 16)))
+
+def cached_dataset(path, columns=None):
+    """load_dataset through the shared cache
+
+    The whole dataset is read once and projected per call, so callers asking
+    for different columns still share one read. The returned frame is a
+    shallow copy, adding or replacing columns does not touch the cache.
+    """
+    path = os.path.abspath(path)
+    df = cache.get(('dataset', path), dataset_paths(path).values(), lambda: load_dataset(path))
+    return (df[columns] if columns is not None else df).copy(deep=False)
+
+def prime_dataset(path, df):
+    """Seed the cache with a full dataset loaded by another process"""
+    path = os.path.abspath(path)
+    cache.put(('dataset', path), df, dataset_paths(path).values())
+
+def cached_model(path, loader=joblib.load):
+    """Load a model artifact through the shared cache"""
+    path = os.path.abspath(path)
+    return cache.get(('model', path, loader), [path], lambda: loader(path))
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+import pandas as pd
+from dataset_io import freshest_source, iter_dataset
+from train_orchestrator import MODEL_SPECS
+from usage_windows import sliding_windows
+
+STATUS_LABELS = np.array(['Normal', 'Overheating', 'Failure'])
+MANIFEST = '_manifest.json'
+
+def load_tree_model(spec):
+    import joblib
+    model = joblib.load(spec['artifacts'][0])
+    model.set_params(n_jobs=1)  # One process per core already
+    return model
+
+def load_usage(spec):
+    from numpy_lstm import NumpyLSTMModel
+    return NumpyLSTMModel.load(spec['artifacts'][1])
+
+def load_speed(spec):
+    import joblib
+    from speed_model import ClosedFormSpeedModel
+    return ClosedFormSpeedModel.from_model(joblib.load(spec['artifacts'][0]))
+
+def score_vibration(model, X):
+    return {'vibration_status': STATUS_LABELS[model.predict(X).astype(int)]}
+
+def score_cooling(model, X):
+    return {'cooling_efficiency': np.where(model.predict(X).astype(bool), 'Efficient', 'Inefficient')}
+
+def score_usage(model, X):
+    # Rows without a full window of history before them get no prediction
+    confidence = np.full(len(X), np.nan, dtype=np.float32)
+    if len(X) >= model.window:
+        windows = sliding_windows(X.astype(np.float32), model.window)
+        confidence[model.window - 1:] = model.predict(windows)[:, 0]
+    return {'usage_confidence': confidence,
+            # A string column even when every row is None, so all parts share one schema
+            'usage_pattern': pd.array(np.where(np.isnan(confidence), None,
+                                               np.where(confidence > 0.5, 'High Usage', 'Low Usage')),
+                                      dtype='string')}
+
+def score_load(model, X):
+    return {'load_type': model.predict(X).astype(str)}
+
+def score_speed(model, X):
+    return {'optimal_speed': model.predict(X)}
+
+# Model name -> (loader, scorer); features and artifacts come from MODEL_SPECS
+SCORERS = {
+    'vibration': (load_tree_model, score_vibration),
+    'cooling': (load_tree_model, score_cooling),
+    'usage': (load_usage, score_usage),
+    'load': (load_tree_model, score_load),
+    'speed': (load_speed, score_speed),
+}
+
+_models = {}
+
+def init_worker(model_names):
+    """Load every model once per worker process"""
+    for name in model_names:
+        _models[name] = SCORERS[name][0](MODEL_SPECS[name])
+
+def score_chunk(index, start, chunk, context, output_dir, keep):
+    """Score one chunk with every loaded model and write it as one Parquet part"""
+    started = time.perf_counter()
+    columns = {'row': np.arange(start, start + len(chunk), dtype=np.int64)}
+    for name in keep:
+        columns[name] = chunk[name].to_numpy()
+    timings = {}
+    for name, model in _models.items():
+        model_start = time.perf_counter()
+        features = MODEL_SPECS[name]['features']
+        X = chunk[features].to_numpy(dtype=float)
+        if name == 'usage' and context is not None:
+            X = np.concatenate([context[features].to_numpy(dtype=float), X])
+            scores = {k: v[len(context):] for k, v in SCORERS[name][1](model, X).items()}
+        else:
+            scores = SCORERS[name][1](model, X)
+        columns.update(scores)
+        timings[name] = time.perf_counter() - model_start
+
+    path = os.path.join(output_dir, f'part-{index:05d}.parquet')
+    tmp = f'{path}.tmp{os.getpid()}'
+    pd.DataFrame(columns).to_parquet(tmp, index=False)
+    os.replace(tmp, path)  # A part exists only once it is complete
+    return index, len(chunk), timings, time.perf_counter() - started
+
+def runnable_models(input_path, requested):
+    """Requested models whose features are all columns of the archive"""
+    fmt, source = freshest_source(input_path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        columns = set(pq.ParquetFile(source).schema_arrow.names)
+    elif fmt == 'feather':
+        import pyarrow.feather as feather
+        columns = set(feather.read_table(source, memory_map=True).schema.names)
+    else:
+        columns = set(pd.read_csv(source, nrows=0).columns)
+    usable = [name for name in requested if set(MODEL_SPECS[name]['features']) <= columns]
+    return usable, [name for name in requested if name not in usable], source
+
+def check_manifest(output_dir, manifest, restart):
+    """Resume only into output written with the same input, chunking and models"""
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path) and not restart:
+        with open(path, 'r') as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise SystemExit(f"{output_dir} holds output of a different run, use --restart to overwrite it")
+    else:
+        for name in os.listdir(output_dir):
+            if name.startswith('part-'):
+                os.remove(os.path.join(output_dir, name))
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+def run_batch(input_path, output_dir, model_names, workers, chunk_rows, keep=(), restart=False):
+    models, skipped, source = runnable_models(input_path, model_names)
+    if skipped:
+        print(f"Skipping {', '.join(skipped)}: features missing from {source}")
+    if not models:
+        raise SystemExit("No model can be scored from this archive")
+    os.makedirs(output_dir, exist_ok=True)
+    # The usage model's window is the one it was trained on
+    window = load_usage(MODEL_SPECS['usage']).window if 'usage' in models else 1
+    stat = os.stat(source)
+    manifest = {'source': os.path.abspath(source), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                'chunk_rows': chunk_rows, 'models': models, 'keep': list(keep), 'usage_window': window}
+    check_manifest(output_dir, manifest, restart)
+    done = {int(name[5:10]) for name in os.listdir(output_dir)
+            if name.startswith('part-') and name.endswith('.parquet')}
+
+    # The usage model's first windows in a chunk reach back into the previous one
+    context_rows = window - 1
+    columns = sorted({c for name in models for c in MODEL_SPECS[name]['features']} | set(keep))
+    model_seconds = dict.fromkeys(models, 0.0)
+    scored_rows = skipped_rows = 0
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(models,)) as pool:
+        pending = set()
+        start = 0
+        tail = None
+        for index, chunk in enumerate(iter_dataset(input_path, columns=columns, chunk_rows=chunk_rows)):
+            # The context_rows rows before this chunk; they span several earlier
+            # chunks when chunks are shorter than the window
+            context = tail
+            if context_rows:
+                recent = chunk.iloc[max(len(chunk) - context_rows, 0):]
+                joined = recent if tail is None else pd.concat([tail, recent], ignore_index=True)
+                tail = joined.iloc[max(len(joined) - context_rows, 0):]
+            if index in done:
+                skipped_rows += len(chunk)
+            else:
+                # Bounded in-flight chunks keep the parent's memory flat
+                if len(pending) >= 2 * workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        scored_rows += collect(future, model_seconds)
+                pending.add(pool.submit(score_chunk, index, start, chunk, context, output_dir, keep))
+            start += len(chunk)
+        for future in pending:
+            scored_rows += collect(future, model_seconds)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\nScored {scored_rows:,} rows in {elapsed:.1f}s: {scored_rows / max(elapsed, 1e-9):,.0f} rows/s "
+          f"({workers} workers, {skipped_rows:,} rows already done)")
+    for name, seconds in model_seconds.items():
+        print(f"  {name:<10}{seconds:>8.1f}s  {scored_rows / max(seconds, 1e-9):>14,.0f} rows/s per worker")
+    print(f"✅ Predictions in {output_dir}")
+
+def collect(future, model_seconds):
+    index, rows, timings, seconds = future.result()
+    for name, model_time in timings.items():
+        model_seconds[name] += model_time
+    print(f"  part {index:05d}: {rows:,} rows in {seconds:.2f}s")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a Parquet/CSV archive with every model")
+    parser.add_argument('input', help="Archive to score (.csv; a fresher .parquet/.feather next to it is preferred)")
+    parser.add_argument('output', help="Directory for the part-NNNNN.parquet prediction files")
+    parser.add_argument('--models', nargs='+', default=list(SCORERS), help="Models to run (default: all)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-rows', type=int, default=200_000)
+    parser.add_argument('--keep', nargs='*', default=[], help="Archive columns to copy next to the predictions")
+    parser.add_argument('--restart', action='store_true', help="Discard earlier output instead of resuming")
+    args = parser.parse_args()
+
+    unknown = set(args.models) - set(SCORERS)
+    if unknown:
+        parser.error(f"unknown models: {', '.join(sorted(unknown))}")
+    run_batch(args.input, args.output, args.models, args.workers, args.chunk_rows, args.keep, args.restart)
@@ -0,0 +1,44 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from dataset_io import load_dataset, save_dataset
+from generate_data import generate_vibration_data_vectorized
+
+# Projections the training and analysis scripts actually read
+PROJECTIONS = {
+    'all columns': None,
+    'vibration model': ['vibration', 'label'],
+    'cooling model': ['vibration', 'peak_vibration', 'stable_vibration', 'cooling_duration',
+                      'vibration_reduction', 'avg_vibration', 'cooling_efficiency']
+}
+
+def median_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def run_benchmark(n_rows, repeat):
+    """Compare typed load time of the same dataset stored as CSV, Parquet and Feather"""
+    df = generate_vibration_data_vectorized(n_rows, rng=np.random.default_rng(42))
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{len(df):,} rows of vibration_data")
+        print(f"{'format':<10}{'size (MB)':>11}" + ''.join(f"{name + ' (s)':>22}" for name in PROJECTIONS))
+        for fmt in ['csv', 'parquet', 'feather']:
+            # One directory per format so load_dataset only sees that file
+            path = os.path.join(tmp, fmt, 'vibration_data.csv')
+            target = save_dataset(df, path, fmt)
+            size = os.path.getsize(target) / 1e6
+            timings = [median_time(lambda: load_dataset(path, columns), repeat) for columns in PROJECTIONS.values()]
+            print(f"{fmt:<10}{size:>11.1f}" + ''.join(f"{t:>22.3f}" for t in timings))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dataset load times per storage format")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,42 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from generate_data import generate_vibration_data, generate_vibration_data_vectorized, write_vibration_data
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run_benchmark(sizes, stream_samples, chunk_size):
+    """Compare the per-row loop generator with the vectorized one"""
+    print(f"{'rows':>10}{'loop (s)':>12}{'vectorized (s)':>16}{'speedup':>10}")
+    for n in sizes:
+        loop_df, loop_time = timed(generate_vibration_data, n)
+        vec_df, vec_time = timed(generate_vibration_data_vectorized, n)
+        assert list(loop_df.columns) == list(vec_df.columns) and len(loop_df) == len(vec_df)
+        print(f"{n:>10}{loop_time:>12.2f}{vec_time:>16.3f}{loop_time / vec_time:>9.0f}x")
+    
+    # Both generators should describe the same distribution
+    print("\nMean vibration_reduction by condition (loop / vectorized):")
+    for condition in ['Normal', 'Overheating', 'Failure']:
+        print(f"  {condition:<12}{loop_df.loc[loop_df['condition'] == condition, 'vibration_reduction'].mean():.4f}"
+              f" / {vec_df.loc[vec_df['condition'] == condition, 'vibration_reduction'].mean():.4f}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'vibration_data.csv')
+        written, stream_time = timed(write_vibration_data, path, stream_samples, chunk_size)
+        size_mb = os.path.getsize(path) / 1e6
+    print(f"\nStreamed {written} rows to CSV in {stream_time:.1f} s "
+          f"({written / stream_time:,.0f} rows/s, {size_mb:.0f} MB, chunks of {chunk_size})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the synthetic data generators")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 30000])
+    parser.add_argument('--stream-samples', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+    np.random.seed(42)
+    run_benchmark(args.sizes, args.stream_samples, args.chunk_size)
@@ -0,0 +1,79 @@
+import argparse
+import time
+import joblib
+import numpy as np
+from dataset_io import load_dataset
+from tree_engine import CompiledTrees, ThresholdLookup, check_parity, check_lookup
+
+def time_calls(predict, rows, repeat):
+    """Median seconds per predict() call over the given rows"""
+    timings = []
+    for _ in range(repeat):
+        for row in rows:
+            start = time.perf_counter()
+            predict(row)
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def run_benchmark(n_rows=200, batch_size=1000, repeat=5):
+    """Compare per-request latency of XGBClassifier.predict and the compiled trees"""
+    data = load_dataset('data/vibration_data.csv')
+    with open('models/cooling_features.txt', 'r') as f:
+        cooling_features = f.read().splitlines()
+    
+    models = {
+        'vibration': (joblib.load('models/vibration_model.joblib'), ['vibration']),
+        'cooling': (joblib.load('models/cooling_model.joblib'), cooling_features)
+    }
+    
+    for name, (model, features) in models.items():
+        start = time.perf_counter()
+        compiled = CompiledTrees.from_model(model)
+        compile_time = time.perf_counter() - start
+        
+        X = data[features].values
+        mismatches = check_parity(model, compiled, X)
+        
+        rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+        batch = X[np.random.randint(0, len(X), batch_size)]
+        xgb_single = time_calls(model.predict, rows, repeat)
+        native_single = time_calls(compiled.predict, rows, repeat)
+        xgb_batch = time_calls(model.predict, [batch], repeat)
+        native_batch = time_calls(compiled.predict, [batch], repeat)
+        
+        print(f"\n{name.capitalize()} model ({len(compiled.roots)} trees, depth {compiled.depth})")
+        print(f"Compile time: {compile_time * 1e3:.1f} ms")
+        print(f"Parity: {mismatches} mismatches over {len(X)} rows")
+        print(f"{'':<24}{'xgboost':>12}{'native':>12}{'speedup':>10}")
+        print(f"{'single row (us/call)':<24}{xgb_single * 1e6:>12.1f}{native_single * 1e6:>12.1f}"
+              f"{xgb_single / native_single:>9.1f}x")
+        print(f"{f'batch of {batch_size} (ms/call)':<24}{xgb_batch * 1e3:>12.2f}{native_batch * 1e3:>12.2f}"
+              f"{xgb_batch / native_batch:>9.1f}x")
+    
+    # Single-feature vibration model through the threshold lookup table
+    model, features = models['vibration']
+    lookup = ThresholdLookup.from_model(model)
+    X = data[features].values
+    rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+    batch = X[np.random.randint(0, len(X), batch_size)]
+    xgb_single = time_calls(model.predict, rows, repeat)
+    lookup_single = time_calls(lookup.predict, rows, repeat)
+    xgb_batch = time_calls(model.predict, [batch], repeat)
+    lookup_batch = time_calls(lookup.predict, [batch], repeat)
+    
+    print(f"\nVibration lookup table ({len(lookup.thresholds)} thresholds)")
+    print(f"Parity: {check_lookup(model, lookup)} mismatches over all threshold boundaries, "
+          f"{check_parity(model, lookup, X)} over {len(X)} rows")
+    print(f"{'':<24}{'xgboost':>12}{'lookup':>12}{'speedup':>10}")
+    print(f"{'single row (us/call)':<24}{xgb_single * 1e6:>12.1f}{lookup_single * 1e6:>12.1f}"
+          f"{xgb_single / lookup_single:>9.1f}x")
+    print(f"{f'batch of {batch_size} (ms/call)':<24}{xgb_batch * 1e3:>12.2f}{lookup_batch * 1e3:>12.2f}"
+          f"{xgb_batch / lookup_batch:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark XGBoost vs compiled tree inference")
+    parser.add_argument('--rows', type=int, default=200, help='single-row calls per repeat')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.batch_size, args.repeat)
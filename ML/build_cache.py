@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+class BuildCache:
+    """Content hashes of the inputs each generated file was last built from
+
+    The manifest is a JSON file mapping a target to {input: [mtime_ns, size,
+    sha256]}. A file whose mtime and size still match is not re-hashed, so
+    checking an unchanged build only costs a stat per input.
+    """
+
+    def __init__(self, manifest_path='.build_cache.json'):
+        self.manifest_path = manifest_path
+        try:
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.manifest = {}
+
+    def digest(self, path, recorded=None):
+        """[mtime_ns, size, sha256] of a file, reusing a recorded hash if the stat matches"""
+        stat = os.stat(path)
+        if recorded and recorded[0] == stat.st_mtime_ns and recorded[1] == stat.st_size:
+            return recorded
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return [stat.st_mtime_ns, stat.st_size, sha.hexdigest()]
+
+    def changed(self, target, inputs):
+        """Inputs whose content differs from the last build of target (all of them if it is missing)"""
+        if not os.path.exists(target) or target not in self.manifest:
+            return list(inputs)
+        recorded = self.manifest[target]
+        changed = []
+        for path in inputs:
+            if not os.path.exists(path):
+                changed.append(path)
+                continue
+            previous = recorded.get(path)
+            if previous is None or self.digest(path, previous)[2] != previous[2]:
+                changed.append(path)
+        return changed + [path for path in recorded if path not in inputs]
+
+    def record(self, target, inputs):
+        recorded = self.manifest.get(target, {})
+        self.manifest[target] = {path: self.digest(path, recorded.get(path))
+                                 for path in inputs if os.path.exists(path)}
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+def build(target, inputs, builder, force=False, manifest_path='.build_cache.json'):
+    """Run builder() unless target exists and its inputs are unchanged, returns True if it ran"""
+    cache = BuildCache(manifest_path)
+    changed = list(inputs) if force else cache.changed(target, inputs)
+    if not changed:
+        print(f"✅ {target} is up to date")
+        return False
+    print(f"Building {target} ({len(changed)} changed inputs: {', '.join(changed[:3])}"
+          f"{', ...' if len(changed) > 3 else ''})")
+    builder()
+    cache.record(target, inputs)
+    return True
+
+def write_if_changed(path, content):
+    """Write a text file only if its content differs, returns True if written"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
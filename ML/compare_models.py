@@ -7,6 +7,7 @@ from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import matplotlib.pyplot as plt
 import seaborn as sns
+from dataset_io import load_dataset
 
 def train_and_evaluate(X_train, X_test, y_train, y_test, model, model_name):
     # Train model
@@ -25,7 +26,7 @@ def train_and_evaluate(X_train, X_test, y_train, y_test, model, model_name):
 
 # Load data
 print("Loading data...")
-df = pd.read_csv('data/vibration_data.csv')
+df = load_dataset('data/vibration_data.csv', columns=['vibration', 'label'])
 
 # Prepare features and target
 X = df[['vibration']].values
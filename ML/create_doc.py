@@ -2,6 +2,32 @@ from docx import Document
 from docx.shared import Inches
 import markdown
 import os
+import sys
+from build_cache import build
+
+DOC_PATH = 'Motor_Cooling_ML_Documentation.docx'
+
+# Plots embedded in the "Results and Analysis" section, grouped by subheading
+DOC_FIGURES = [
+    ("Vibration Analysis", [
+        ('plots/vibration/vibration_distribution.png', "Figure 1: Vibration Distribution by Motor Status"),
+        ('plots/vibration/confusion_matrix.png', "Figure 2: Vibration Model Confusion Matrix")]),
+    ("Cooling Efficiency Analysis", [
+        ('plots/cooling/cooling_metrics.png', "Figure 3: Cooling Efficiency Metrics"),
+        ('plots/cooling/confusion_matrix.png', "Figure 4: Cooling Model Confusion Matrix")]),
+    ("Feature Analysis", [
+        ('plots/feature_importance.png', "Figure 5: Feature Importance for Both Models"),
+        ('plots/cooling/correlation_matrix.png', "Figure 6: Cooling Features Correlation Matrix")]),
+    ("Time Series Analysis", [
+        ('plots/time_series.png', "Figure 7: Time Series Analysis of Vibration and Cooling")]),
+    ("Model Performance Curves", [
+        ('plots/roc_curves.png', "Figure 8: ROC Curves for Both Models")]),
+]
+
+def doc_inputs():
+    """Files the document is built from"""
+    plots = [path for _, figures in DOC_FIGURES for path, _ in figures]
+    return ['documentation.md', os.path.relpath(__file__)] + plots
 
 def create_word_doc():
     # Create a new Word document
@@ -31,43 +57,19 @@ def create_word_doc():
         if "Results and Analysis" in lines[0]:
             doc.add_heading("Visualization Results", 2)
             
-            # Add Vibration Analysis plots
-            doc.add_heading("Vibration Analysis", 3)
-            doc.add_picture('plots/vibration/vibration_distribution.png', width=Inches(6))
-            doc.add_paragraph("Figure 1: Vibration Distribution by Motor Status")
-            
-            doc.add_picture('plots/vibration/confusion_matrix.png', width=Inches(6))
-            doc.add_paragraph("Figure 2: Vibration Model Confusion Matrix")
-            
-            # Add Cooling Analysis plots
-            doc.add_heading("Cooling Efficiency Analysis", 3)
-            doc.add_picture('plots/cooling/cooling_metrics.png', width=Inches(6))
-            doc.add_paragraph("Figure 3: Cooling Efficiency Metrics")
-            
-            doc.add_picture('plots/cooling/confusion_matrix.png', width=Inches(6))
-            doc.add_paragraph("Figure 4: Cooling Model Confusion Matrix")
-            
-            # Add Feature Analysis plots
-            doc.add_heading("Feature Analysis", 3)
-            doc.add_picture('plots/feature_importance.png', width=Inches(6))
-            doc.add_paragraph("Figure 5: Feature Importance for Both Models")
-            
-            doc.add_picture('plots/cooling/correlation_matrix.png', width=Inches(6))
-            doc.add_paragraph("Figure 6: Cooling Features Correlation Matrix")
-            
-            # Add Time Series Analysis
-            doc.add_heading("Time Series Analysis", 3)
-            doc.add_picture('plots/time_series.png', width=Inches(6))
-            doc.add_paragraph("Figure 7: Time Series Analysis of Vibration and Cooling")
-            
-            # Add ROC Curves
-            doc.add_heading("Model Performance Curves", 3)
-            doc.add_picture('plots/roc_curves.png', width=Inches(6))
-            doc.add_paragraph("Figure 8: ROC Curves for Both Models")
+            for heading, figures in DOC_FIGURES:
+                doc.add_heading(heading, 3)
+                for path, caption in figures:
+                    doc.add_picture(path, width=Inches(6))
+                    doc.add_paragraph(caption)
     
     # Save the document
-    doc.save('Motor_Cooling_ML_Documentation.docx')
+    doc.save(DOC_PATH)
     print("✅ Word document created successfully with all plots!")
 
 if __name__ == "__main__":
-    create_word_doc()
+    if '--plots' in sys.argv:
+        # Re-render the stale figures first, unchanged ones are skipped
+        from plot_pipeline import FIGURES, run_pipeline
+        run_pipeline([figure for figure in FIGURES if figure.target.startswith('analyze_models:')])
+    build(DOC_PATH, doc_inputs(), create_word_doc, force='--force' in sys.argv)
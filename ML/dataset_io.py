@@ -0,0 +1,135 @@
+import os
+import sys
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # CSV only
+    feather = None
+
+# Typed columns of every dataset, keyed by file stem. Categories are listed in
+# their natural order so plots and reports keep a stable class order.
+DATASET_SCHEMAS = {
+    'vibration_data': {
+        'categorical': {'condition': ['Normal', 'Overheating', 'Failure'],
+                        'cooling_efficiency': ['Efficient', 'Inefficient']},
+        'datetime': ['timestamp']
+    },
+    'vibration_usage_patterns': {
+        'categorical': {'Usage_Label': ['High Usage', 'Low Usage']},
+        'datetime': ['Timestamp']
+    },
+    'vibration_load_patterns': {
+        'categorical': {'Load_Type': ['Light Load', 'Normal Load', 'Peak Load']},
+        'datetime': []
+    },
+    'motor_start_stop': {
+        'categorical': {'Motor_State': ['Running', 'Stopped']},
+        'datetime': ['Timestamp']
+    },
+    'motor_speed_data': {
+        'categorical': {},
+        'datetime': []
+    }
+}
+
+FORMATS = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv'}
+
+def dataset_paths(path):
+    """Candidate files of a dataset in every supported format, keyed by format"""
+    stem = os.path.splitext(path)[0]
+    return {fmt: stem + ext for fmt, ext in FORMATS.items()}
+
+def apply_schema(df, path):
+    """Convert label and timestamp columns of a dataset to their typed dtypes"""
+    schema = DATASET_SCHEMAS.get(os.path.splitext(os.path.basename(path))[0])
+    if schema is None:
+        return df
+    for column, categories in schema['categorical'].items():
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = pd.Categorical(df[column], categories=categories)
+    for column in schema['datetime']:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+def save_dataset(df, path, fmt=None):
+    """Write a dataset next to `path` (a .csv path) in the configured format
+
+    The format defaults to DATASET_FORMAT, or Parquet when pyarrow is
+    installed and CSV otherwise. Returns the path written.
+    """
+    fmt = fmt or os.environ.get('DATASET_FORMAT') or ('parquet' if feather is not None else 'csv')
+    target = dataset_paths(path)[fmt]
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    if fmt == 'csv':
+        df.to_csv(target, index=False)
+    else:
+        df = apply_schema(df.copy(), path)
+        if fmt == 'parquet':
+            df.to_parquet(target, index=False)
+        else:
+            feather.write_feather(df, target)
+    return target
+
+def freshest_source(path):
+    """(format, file) of the copy of a dataset to read"""
+    available = {fmt: p for fmt, p in dataset_paths(path).items()
+                 if os.path.exists(p) and (fmt == 'csv' or feather is not None)}
+    if not available:
+        raise FileNotFoundError(path)
+    # Prefer columnar formats when they are at least as new as the CSV
+    fmt = max(available, key=lambda f: (os.path.getmtime(available[f]), f != 'csv'))
+    return fmt, available[fmt]
+
+def load_dataset(path, columns=None):
+    """Load the freshest copy of a dataset, reading only the requested columns
+
+    Columnar files are memory-mapped and keep their types; CSV is the fallback
+    and gets the same typing applied after parsing.
+    """
+    fmt, source = freshest_source(path)
+
+    if fmt == 'parquet':
+        df = pd.read_parquet(source, columns=columns, memory_map=True)
+    elif fmt == 'feather':
+        df = feather.read_table(source, columns=columns, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(source, usecols=columns)
+    if columns is not None:
+        df = df[columns]
+    return apply_schema(df, path)
+
+def iter_dataset(path, columns=None, chunk_rows=100_000):
+    """Yield a dataset in typed chunks of at most chunk_rows rows, same format choice as load_dataset
+
+    Only one chunk (plus the reader's buffers) is in memory at a time.
+    """
+    fmt, source = freshest_source(path)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        batches = (batch.to_pandas() for batch in
+                   pq.ParquetFile(source, memory_map=True).iter_batches(chunk_rows, columns=columns))
+    elif fmt == 'feather':
+        table = feather.read_table(source, columns=columns, memory_map=True)
+        batches = (batch.to_pandas() for batch in table.to_batches(chunk_rows))
+    else:
+        batches = pd.read_csv(source, usecols=columns, chunksize=chunk_rows)
+    for df in batches:
+        if columns is not None:
+            df = df[columns]
+        yield apply_schema(df, path)
+
+def convert(paths, fmt='parquet'):
+    """Rewrite existing CSV datasets in a columnar format"""
+    for path in paths:
+        target = save_dataset(apply_schema(pd.read_csv(path), path), path, fmt)
+        print(f"✅ {path} -> {target}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'convert':
+        print("Usage: python dataset_io.py convert [--feather] data/file.csv [...]")
+        sys.exit(1)
+    args = sys.argv[2:]
+    convert([a for a in args if a != '--feather'], 'feather' if '--feather' in args else 'parquet')
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
+from dataset_io import apply_schema, dataset_paths, save_dataset
 from datetime import datetime, timedelta
 
 # Set random seed for reproducibility
@@ -76,13 +78,108 @@ def generate_vibration_data(n_samples=1000):
     
     return df
 
+CONDITIONS = np.array(['Normal', 'Overheating', 'Failure'])
+BASE_VIBRATION_MEAN = np.array([2000, 6000, 9000])
+BASE_VIBRATION_STD = np.array([300, 500, 700])
+
+def generate_vibration_data_vectorized(n_samples=1000, rng=None, start_time=None,
+                                       duration_minutes=30, readings_per_minute=2, shuffle=True):
+    """Array-based equivalent of generate_vibration_data
+
+    All cooling cycles are generated as one (n_samples, readings) array and
+    the per-cycle metrics are computed column-wise.
+    """
+    rng = rng if rng is not None else np.random.default_rng(42)
+    start_time = start_time if start_time is not None else datetime.now()
+    n = (n_samples // 3) * 3
+    
+    # Conditions interleave Normal, Overheating, Failure like the loop version
+    label = np.tile(np.arange(3), n // 3)
+    initial_vibration = rng.normal(BASE_VIBRATION_MEAN[label], BASE_VIBRATION_STD[label])
+    
+    # Generate all cooling cycles at once
+    total_readings = duration_minutes * readings_per_minute
+    time_points = np.linspace(0, duration_minutes, total_readings)
+    cooling_effectiveness = rng.uniform(0.5, 1.0, n)
+    vibrations = initial_vibration[:, None] * np.exp(-cooling_effectiveness[:, None] * time_points / duration_minutes)
+    vibrations += rng.standard_normal((n, total_readings)) * np.abs(initial_vibration * 0.05)[:, None]
+    
+    # Calculate cooling metrics
+    cooling_duration = duration_minutes * (1 - np.exp(-cooling_effectiveness))
+    stable_vibration = vibrations[:, -1]
+    vibration_reduction = (initial_vibration - stable_vibration) / initial_vibration
+    
+    # Determine cooling efficiency, Failure is always inefficient
+    efficient = np.where(label == 0, vibration_reduction > 0.3,
+                         (label == 1) & (vibration_reduction > 0.25))
+    
+    df = pd.DataFrame({
+        'timestamp': pd.Timestamp(start_time) + pd.to_timedelta(np.arange(n) * 30, unit='m'),
+        'vibration': initial_vibration,
+        'label': label,
+        'condition': CONDITIONS[label],
+        'cooling_duration': cooling_duration,
+        'vibration_reduction': vibration_reduction,
+        'cooling_efficiency': np.where(efficient, 'Efficient', 'Inefficient'),
+        'stable_vibration': stable_vibration,
+        'peak_vibration': vibrations.max(axis=1),
+        'avg_vibration': vibrations.mean(axis=1)
+    })
+    
+    if shuffle:
+        df = df.iloc[rng.permutation(n)].reset_index(drop=True)
+    return df
+
+def write_vibration_data(path, n_samples, chunk_size=100_000, seed=42, fmt='csv'):
+    """Stream vectorized samples to a CSV or Parquet file chunk by chunk
+
+    Peak memory is bounded by chunk_size; rows are shuffled within each chunk.
+    """
+    rng = np.random.default_rng(seed)
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    start_time = pd.Timestamp(datetime.now())
+    target = dataset_paths(path)[fmt]
+    writer = None
+    written = 0
+    while written < n_samples:
+        chunk = generate_vibration_data_vectorized(min(chunk_size, n_samples - written), rng=rng,
+                                                   start_time=start_time + pd.Timedelta(minutes=30 * written))
+        if chunk.empty:
+            break
+        if fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(apply_schema(chunk, path), preserve_index=False)
+            writer = writer or pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(target, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += len(chunk)
+    if writer is not None:
+        writer.close()
+    return written
+
 # Generate and save data
 if __name__ == "__main__":
-    data = generate_vibration_data()
+    parser = argparse.ArgumentParser(description="Generate synthetic vibration and cooling data")
+    parser.add_argument('--vectorized', action='store_true',
+                        help='use the array-based generator and stream chunks to disk')
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--output', default='data/vibration_data.csv')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    args = parser.parse_args()
     
     # Create directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
     
-    # Save to CSV
-    data.to_csv('data/vibration_data.csv', index=False)
-    print("✅ Generated synthetic vibration and cooling data and saved to 'data/vibration_data.csv'")
+    if args.vectorized:
+        written = write_vibration_data(args.output, args.samples, args.chunk_size, fmt=args.format)
+        target = dataset_paths(args.output)[args.format]
+        print(f"✅ Generated {written} rows of synthetic vibration and cooling data and saved to '{target}'")
+    else:
+        data = generate_vibration_data(args.samples)
+        
+        # Save in the requested format
+        target = save_dataset(data, args.output, args.format)
+        print(f"✅ Generated synthetic vibration and cooling data and saved to '{target}'")
@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+import time
+import numpy as np
+
+# Rollup tiers, bucket width in seconds
+RESOLUTIONS = {'1m': 60, '1h': 3600, '1d': 86400}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    pump TEXT NOT NULL,
+    time REAL NOT NULL,
+    vibration REAL NOT NULL,
+    status INTEGER NOT NULL,
+    inefficient INTEGER NOT NULL,
+    reduction REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS readings_pump_time ON readings (pump, time);
+CREATE INDEX IF NOT EXISTS readings_time ON readings (time);
+CREATE TABLE IF NOT EXISTS rollups (
+    pump TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    vibration_min REAL NOT NULL,
+    vibration_max REAL NOT NULL,
+    vibration_sum REAL NOT NULL,
+    reduction_sum REAL NOT NULL,
+    normal INTEGER NOT NULL,
+    overheating INTEGER NOT NULL,
+    failure INTEGER NOT NULL,
+    inefficient INTEGER NOT NULL,
+    PRIMARY KEY (pump, resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+# Merging a batch aggregate into an existing bucket
+UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (pump, resolution, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    vibration_min = MIN(vibration_min, excluded.vibration_min),
+    vibration_max = MAX(vibration_max, excluded.vibration_max),
+    vibration_sum = vibration_sum + excluded.vibration_sum,
+    reduction_sum = reduction_sum + excluded.reduction_sum,
+    normal = normal + excluded.normal,
+    overheating = overheating + excluded.overheating,
+    failure = failure + excluded.failure,
+    inefficient = inefficient + excluded.inefficient
+"""
+
+class HistoryStore:
+    """Raw readings plus 1-minute/1-hour/1-day rollups in one SQLite file
+
+    Rollups are updated in the same transaction as the raw insert, one
+    upsert per (pump, tier, bucket) touched by the batch, so range queries
+    on a tier read at most one row per bucket and never the raw table.
+    Raw readings older than retention seconds are deleted, at most once
+    every prune_interval seconds; rollups are kept. retention=None keeps
+    every raw reading.
+    """
+
+    def __init__(self, path, retention=None, prune_interval=60.0):
+        self.path = path
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.last_prune = 0.0
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+        with self.connection() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    def connection(self):
+        """SQLite connection of the calling thread"""
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path)
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def insert(self, pump_ids, times, vibrations, status_codes, inefficient, reductions):
+        """Store a batch of scored readings and fold it into every rollup tier"""
+        pump_ids = np.asarray(pump_ids, dtype=object)
+        times = np.asarray(times, dtype=float)
+        vibrations = np.asarray(vibrations, dtype=float)
+        status_codes = np.asarray(status_codes, dtype=np.int64)
+        inefficient = np.asarray(inefficient, dtype=np.int64)
+        reductions = np.asarray(reductions, dtype=float)
+
+        raw_rows = list(zip(pump_ids.tolist(), times.tolist(), vibrations.tolist(),
+                            status_codes.tolist(), inefficient.tolist(), reductions.tolist()))
+        pumps, pump_index = np.unique(pump_ids, return_inverse=True)
+        rollup_rows = []
+        for resolution, seconds in RESOLUTIONS.items():
+            buckets = (times // seconds).astype(np.int64) * seconds
+            keys, group = np.unique(np.column_stack([pump_index, buckets]), axis=0, return_inverse=True)
+            group = group.ravel()
+            n = len(keys)
+            vibration_min = np.full(n, np.inf)
+            vibration_max = np.full(n, -np.inf)
+            np.minimum.at(vibration_min, group, vibrations)
+            np.maximum.at(vibration_max, group, vibrations)
+            status = np.bincount(group * 3 + status_codes, minlength=3 * n).reshape(n, 3)
+            columns = zip(
+                pumps[keys[:, 0]].tolist(), [resolution] * n, keys[:, 1].tolist(),
+                np.bincount(group, minlength=n).tolist(),
+                vibration_min.tolist(), vibration_max.tolist(),
+                np.bincount(group, weights=vibrations, minlength=n).tolist(),
+                np.bincount(group, weights=reductions, minlength=n).tolist(),
+                status[:, 0].tolist(), status[:, 1].tolist(), status[:, 2].tolist(),
+                np.bincount(group, weights=inefficient, minlength=n).astype(np.int64).tolist()
+            )
+            rollup_rows.extend(columns)
+
+        with self.write_lock, self.connection() as db:
+            db.executemany('INSERT INTO readings VALUES (?, ?, ?, ?, ?, ?)', raw_rows)
+            db.executemany(UPSERT_ROLLUP, rollup_rows)
+            now = time.time()
+            if self.retention and now - self.last_prune >= self.prune_interval:
+                db.execute('DELETE FROM readings WHERE time < ?', (now - self.retention,))
+                self.last_prune = now
+
+    def pick_resolution(self, start, end, max_points=1000):
+        """Finest tier that covers [start, end] in at most max_points buckets"""
+        for resolution, seconds in RESOLUTIONS.items():
+            if (end - start) / seconds <= max_points:
+                return resolution
+        return list(RESOLUTIONS)[-1]
+
+    def query(self, pump_id, start, end, resolution):
+        """Buckets of a tier overlapping [start, end], oldest first"""
+        seconds = RESOLUTIONS[resolution]
+        rows = self.connection().execute(
+            """SELECT bucket, count, vibration_min, vibration_max, vibration_sum / count,
+                      reduction_sum / count, normal, overheating, failure, inefficient
+               FROM rollups WHERE pump = ? AND resolution = ? AND bucket BETWEEN ? AND ?
+               ORDER BY bucket""",
+            (pump_id, resolution, int(start // seconds) * seconds, int(end))).fetchall()
+        return [
+            {
+                'time': bucket,
+                'count': count,
+                'vibration': {'min': vmin, 'max': vmax, 'mean': vmean},
+                'reduction': rmean,
+                'status': {'Normal': normal, 'Overheating': overheating, 'Failure': failure},
+                'inefficient': n_inefficient
+            }
+            for bucket, count, vmin, vmax, vmean, rmean, normal, overheating, failure, n_inefficient in rows
+        ]
+
+    def query_raw(self, pump_id, start, end, limit=1000):
+        """Raw readings in [start, end], oldest first, at most limit of them"""
+        rows = self.connection().execute(
+            """SELECT time, vibration, status, inefficient, reduction FROM readings
+               WHERE pump = ? AND time BETWEEN ? AND ? ORDER BY time LIMIT ?""",
+            (pump_id, start, end, limit)).fetchall()
+        return [{'time': time, 'vibration': vibration, 'status': status,
+                 'inefficient': bool(inefficient), 'reduction': reduction}
+                for time, vibration, status, inefficient, reduction in rows]
+
+    def vibration_series(self, pump_id, start, end):
+        """(times, vibrations) arrays of the raw readings in (start, end], oldest first"""
+        rows = self.connection().execute(
+            'SELECT time, vibration FROM readings WHERE pump = ? AND time > ? AND time <= ? ORDER BY time',
+            (pump_id, start, end)).fetchall()
+        series = np.array(rows, dtype=float).reshape(-1, 2)
+        return series[:, 0], series[:, 1]
@@ -0,0 +1,94 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+
+# Default payloads, shaped like the ones the Node backend sends
+PAYLOADS = {
+    '/predict': {'vibration': 5000},
+    '/predict_usage': {'Hour': 8, 'Day': 2, 'Vibration_Level': 2000, 'Usage_Frequency': 0.8},
+    '/predict_load': {'Vibration_Level': 2000, 'Motor_Current': 10, 'Power_Consumption': 7.46},
+    '/predict_speed': {'Required_Flow_Rate': 150, 'System_Pressure': 50, 'Power_Consumption': 30},
+    # An hour of one-minute readings; Reset makes every request analyze all of them
+    '/analyze_start_stop': {'Pump_ID': 'load-test', 'Reset': True,
+                            'Vibration_Level': [20, 180, 200, 90, 30, 170, 40, 160] * 8}
+}
+
+def worker(url, body, deadline, latencies, errors):
+    """Send requests back to back on one keep-alive connection until the deadline"""
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('POST', target.path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def run_load_test(url, payload, concurrency=16, duration=10.0):
+    """Hammer one endpoint with concurrent clients and summarize latency"""
+    body = json.dumps(payload)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker, args=(url, body, deadline, latencies, errors))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e3
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+        'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else float('nan')
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the ML serving endpoints")
+    parser.add_argument('urls', nargs='+',
+                        help='e.g. http://localhost:5050/predict; give the same endpoint on two servers '
+                             '(ML_SERVER=flask and ML_SERVER=asgi) to compare them side by side')
+    parser.add_argument('--payload', help='JSON body, defaults to a typical payload for the endpoint')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per concurrency level and URL')
+    args = parser.parse_args()
+
+    paths = {urlparse(url).path for url in args.urls}
+    if len(paths) > 1 and not args.payload:
+        parser.error("URLs of different endpoints need an explicit --payload")
+    payload = json.loads(args.payload) if args.payload else PAYLOADS[paths.pop()]
+
+    for i, url in enumerate(args.urls):
+        print(f"[{i}] {url}")
+    header = f"{'clients':>8}" + ''.join(f"{f'[{i}] req/s':>12}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+                                         for i in range(len(args.urls)))
+    if len(args.urls) > 1:
+        header += f"{'speedup':>9}"
+    print(header)
+    for concurrency in args.concurrency:
+        # URLs are driven one after the other, never at the same time
+        results = [run_load_test(url, payload, concurrency, args.duration) for url in args.urls]
+        line = f"{concurrency:>8}" + ''.join(f"{stats['rps']:>12.1f}{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                                             f"{stats['errors']:>8}" for stats in results)
+        if len(results) > 1:
+            line += f"{results[-1]['rps'] / max(results[0]['rps'], 1e-9):>8.2f}x"
+        print(line)
@@ -0,0 +1,211 @@
+import bisect
+import threading
+import time
+import numpy as np
+
+# Latency buckets in seconds, 10 µs to 10 s
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Timer:
+    """Context manager adding its elapsed time to a histogram"""
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+class Histogram:
+    """Bucketed observations of one label set; observe() is a bisect and three adds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return Timer(self)
+
+    def samples(self, name, labels):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = np.cumsum(counts).tolist()
+        for bound, count in zip(self.buckets + (float('inf'),), cumulative):
+            yield f'{name}_bucket', dict(labels, le=format_value(float(bound))), count
+        yield f'{name}_sum', labels, total
+        yield f'{name}_count', labels, cumulative[-1]
+
+class ClassCounts:
+    """Prediction counts over a fixed list of classes, added a whole batch at a time"""
+
+    def __init__(self, classes):
+        self.classes = list(classes)
+        self.index = {cls: i for i, cls in enumerate(self.classes)}
+        self.values = np.zeros(len(self.classes), dtype=np.int64)
+        self.lock = threading.Lock()
+
+    def add(self, counts):
+        with self.lock:
+            self.values += counts
+
+    def extend(self, classes):
+        """Add classes not counted yet (e.g. of a reloaded model), keeping existing counts"""
+        new = [cls for cls in classes if cls not in self.index]
+        if new:
+            with self.lock:
+                for cls in new:
+                    if cls not in self.index:
+                        self.index[cls] = len(self.classes)
+                        self.classes.append(cls)
+                self.values = np.concatenate([self.values, np.zeros(len(self.classes) - len(self.values), dtype=np.int64)])
+
+    def add_codes(self, codes):
+        """Count an array of class indices"""
+        codes = np.asarray(codes, dtype=np.intp)
+        with self.lock:
+            self.values += np.bincount(codes, minlength=len(self.values))
+
+    def add_labels(self, labels):
+        """Count a list of class names; names outside the class list are ignored"""
+        self.add_codes([self.index[label] for label in labels if label in self.index])
+
+    def snapshot(self):
+        with self.lock:
+            return self.values.copy()
+
+    def samples(self, name, labels, class_label):
+        with self.lock:
+            classes, values = list(self.classes), self.values.tolist()
+        for cls, value in zip(classes, values):
+            yield name, dict(labels, **{class_label: cls}), value
+
+class Family:
+    """A named metric with one child per label values tuple"""
+
+    def __init__(self, name, help_text, kind, label_names, factory, class_label=None):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.factory = factory
+        self.class_label = class_label
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values, **options):
+        """Child for the label values, created on first use (options go to its constructor)"""
+        child = self.children.get(values)
+        if child is None:
+            with self.lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = self.children[values] = self.factory(**options)
+        return child
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            labels = dict(zip(self.label_names, values))
+            if self.kind == 'histogram':
+                yield from child.samples(self.name, labels)
+            else:
+                yield from child.samples(self.name, labels, self.class_label)
+
+class MetricsRegistry:
+    """Metrics of one process, rendered in the Prometheus text format
+
+    Histograms and class counters are updated inline by the request path;
+    collectors are callables run at scrape time that turn existing stats
+    (micro-batcher, result caches) into samples.
+    """
+
+    def __init__(self):
+        self.families = []
+        self.collectors = []
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        family = Family(name, help_text, 'histogram', label_names, lambda: Histogram(buckets))
+        self.families.append(family)
+        return family
+
+    def class_counter(self, name, help_text, label_names=(), class_label='class'):
+        """Counter family whose children count a fixed class list: .labels(..., classes=[...])"""
+        family = Family(name, help_text, 'counter', label_names, ClassCounts, class_label)
+        self.families.append(family)
+        return family
+
+    def collector(self, fn):
+        """Register fn() -> [(name, kind, help, [(labels, value), ...]), ...]"""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for family in self.families:
+            lines.append(f'# HELP {family.name} {family.help}')
+            lines.append(f'# TYPE {family.name} {family.kind}')
+            lines.extend(f'{name}{format_labels(labels)} {format_value(value)}'
+                         for name, labels, value in family.samples())
+        for collect in self.collectors:
+            for name, kind, help_text, samples in collect():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(f'{name}{format_labels(labels)} {format_value(value)}' for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+def batcher_collector(batchers):
+    """Collector over {name: MicroBatcher}"""
+    def collect():
+        stats = {name: batcher.metrics() for name, batcher in batchers.items()}
+        return [
+            ('ml_batcher_batches_total', 'counter', 'Forward passes run by the micro-batcher',
+             [({'batcher': name}, s['batches']) for name, s in stats.items()]),
+            ('ml_batcher_rows_total', 'counter', 'Rows scored by the micro-batcher',
+             [({'batcher': name}, s['rows']) for name, s in stats.items()]),
+            ('ml_batcher_batch_fill', 'gauge', 'Mean batch size over max_batch_size',
+             [({'batcher': name}, s['batch_fill']) for name, s in stats.items()]),
+            ('ml_batcher_queue_latency_seconds', 'gauge', 'Queue wait over the last 1024 requests',
+             [({'batcher': name, 'quantile': q}, s['queue_latency_ms'][key] / 1e3)
+              for name, s in stats.items() for q, key in (('0.5', 'p50'), ('0.99', 'p99'))]),
+        ]
+    return collect
+
+def cache_collector(caches):
+    """Collector over {name: ResultCache}"""
+    def collect():
+        stats = {name: cache.metrics() for name, cache in caches.items()}
+        families = [
+            (f'ml_result_cache_{key}_total', 'counter', f'Result cache {key}',
+             [({'cache': name}, s[key]) for name, s in stats.items()])
+            for key in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+        ]
+        families.append(('ml_result_cache_entries', 'gauge', 'Entries held by the result cache',
+                         [({'cache': name}, s['entries']) for name, s in stats.items()]))
+        return families
+    return collect
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+class ModelRegistry:
+    """Load model artifacts on first use, cache them and pick up changed files
+
+    Artifacts live in `root`, or in `root/<version>` when a version is given
+    (argument, MODEL_VERSION env var, or the name stored in `root/CURRENT`).
+    Publishing a new version is then an atomic os.replace of CURRENT. A
+    changed artifact is loaded completely before it replaces the cached
+    model, and a failed load keeps serving the previous one.
+    """
+
+    def __init__(self, root, version=None, check_interval=2.0):
+        self.root = os.path.abspath(root)
+        self.version = version or os.environ.get('MODEL_VERSION')
+        self.check_interval = check_interval
+        self.specs = {}
+        self.entries = {}
+        self.locks = {}
+
+    def register(self, name, filename, loader):
+        """Declare an artifact; loader(path) is only called on first get()"""
+        self.specs[name] = (filename, loader)
+        self.locks[name] = threading.Lock()
+
+    def current_version(self):
+        """Version directory in use, None for a flat models directory"""
+        if self.version:
+            return self.version
+        try:
+            with open(os.path.join(self.root, 'CURRENT'), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def path(self, name):
+        """Absolute path of an artifact in the current version"""
+        filename, _ = self.specs[name]
+        version = self.current_version()
+        return os.path.join(self.root, version, filename) if version else os.path.join(self.root, filename)
+
+    def _stamp(self, name):
+        path = self.path(name)
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+
+    def get(self, name):
+        """Return the cached model, loading or reloading it if its artifact changed"""
+        entry = self.entries.get(name)
+        if entry is not None and time.monotonic() - entry['checked'] < self.check_interval:
+            return entry['model']
+
+        with self.locks[name]:
+            entry = self.entries.get(name)
+            try:
+                stamp = self._stamp(name)
+            except FileNotFoundError:
+                if entry is None:
+                    raise
+                entry['checked'] = time.monotonic()
+                return entry['model']
+
+            if entry is not None and entry['stamp'] == stamp:
+                entry['checked'] = time.monotonic()
+                return entry['model']
+
+            _, loader = self.specs[name]
+            try:
+                model = loader(stamp[0])
+            except Exception as e:
+                if entry is None:
+                    raise
+                print(f"Reloading {name} from {stamp[0]} failed, keeping the previous model: {e}")
+                entry['checked'] = time.monotonic()
+                return entry['model']
+
+            self.entries[name] = {'model': model, 'stamp': stamp, 'checked': time.monotonic()}
+            return model
+
+    def stamp(self, name):
+        """(path, mtime_ns, size) of the loaded artifact, changes whenever it is reloaded"""
+        self.get(name)
+        return self.entries[name]['stamp']
+
+    def loaded(self):
+        """Names and artifact paths of the models loaded so far"""
+        return {name: entry['stamp'][0] for name, entry in self.entries.items()}
@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from artifact_cache import ArtifactCache, cached_dataset, prime_dataset
+from dataset_io import dataset_paths
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERN_DIR = os.path.join(ML_DIR, 'advanced_monitoring')
+STATE_FILE = os.path.join(ML_DIR, 'plots', '.plot_pipeline_state.json')
+
+# A figure is rendered by calling module.function() inside workdir. Its
+# datasets and models (paths relative to workdir) decide when it is stale.
+Figure = namedtuple('Figure', ['target', 'workdir', 'datasets', 'models', 'outputs'])
+
+VIBRATION_DATA = 'data/vibration_data.csv'
+VIBRATION_MODELS = ['models/vibration_model.joblib', 'models/cooling_model.joblib']
+USAGE_DATA = 'data/vibration_usage_patterns.csv'
+LOAD_DATA = 'data/vibration_load_patterns.csv'
+SPEED_DATA = 'data/motor_speed_data.csv'
+USAGE_MODEL = 'models/usage_prediction_model.h5'
+LOAD_MODEL = 'models/load_classification_model.pkl'
+SPEED_MODEL = 'models/speed_optimization_model.pkl'
+
+FIGURES = [
+    Figure('analyze_models:plot_vibration_distribution', ML_DIR, [VIBRATION_DATA], [],
+           ['plots/vibration/vibration_distribution.png']),
+    Figure('analyze_models:plot_cooling_efficiency', ML_DIR, [VIBRATION_DATA], [],
+           ['plots/cooling/cooling_metrics.png']),
+    Figure('analyze_models:plot_vibration_confusion_matrix', ML_DIR, [VIBRATION_DATA], VIBRATION_MODELS,
+           ['plots/vibration/confusion_matrix.png']),
+    Figure('analyze_models:plot_cooling_confusion_matrix', ML_DIR, [VIBRATION_DATA], VIBRATION_MODELS,
+           ['plots/cooling/confusion_matrix.png']),
+    Figure('analyze_models:plot_feature_importance', ML_DIR, [], VIBRATION_MODELS,
+           ['plots/feature_importance.png']),
+    Figure('analyze_models:plot_cooling_correlation', ML_DIR, [VIBRATION_DATA], [],
+           ['plots/cooling/correlation_matrix.png']),
+    Figure('analyze_models:plot_time_series', ML_DIR, [VIBRATION_DATA], [],
+           ['plots/time_series.png']),
+    Figure('analyze_models:plot_roc_curves', ML_DIR, [VIBRATION_DATA], VIBRATION_MODELS,
+           ['plots/roc_curves.png']),
+    Figure('analyze_patterns:analyze_usage_patterns', PATTERN_DIR, [USAGE_DATA], [],
+           ['plots/usage_patterns.png']),
+    Figure('analyze_patterns:analyze_load_patterns', PATTERN_DIR, [LOAD_DATA], [],
+           ['plots/load_patterns.png']),
+    Figure('analyze_patterns:analyze_speed_optimization', PATTERN_DIR, [SPEED_DATA], [],
+           ['plots/speed_optimization.png']),
+    Figure('analyze_patterns:analyze_model_performance', PATTERN_DIR, [USAGE_DATA, LOAD_DATA, SPEED_DATA],
+           [USAGE_MODEL, LOAD_MODEL, SPEED_MODEL], ['plots/model_performance.png']),
+    Figure('advanced_analysis:analyze_feature_importance', PATTERN_DIR, [LOAD_DATA], [LOAD_MODEL],
+           ['plots/feature_importance.png']),
+    Figure('advanced_analysis:analyze_learning_curves', PATTERN_DIR, [LOAD_DATA, SPEED_DATA],
+           [LOAD_MODEL, SPEED_MODEL], ['plots/learning_curves.png']),
+    Figure('advanced_analysis:analyze_error_distribution', PATTERN_DIR, [SPEED_DATA], [SPEED_MODEL],
+           ['plots/error_analysis.png']),
+    Figure('advanced_analysis:analyze_temporal_patterns', PATTERN_DIR, [USAGE_DATA], [],
+           ['plots/temporal_patterns.png']),
+]
+
+def share_frame(df):
+    """Copy the columns of a DataFrame into shared memory blocks
+
+    Returns a picklable description of the frame and the blocks, which the
+    caller must close and unlink once the workers are done. Categorical
+    columns share their codes and datetimes their int64 values; anything
+    else that is not numeric travels inside the description.
+    """
+    columns, blocks = [], []
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            values, extra = column.cat.codes.to_numpy(), ('category', list(column.cat.categories),
+                                                           column.cat.ordered)
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            values, extra = column.to_numpy().view(np.int64), ('datetime', str(column.dtype))
+        elif pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            values, extra = column.to_numpy(), ('numeric',)
+        else:
+            columns.append((name, None, None, 0, ('object', column.tolist())))
+            continue
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        blocks.append(block)
+        columns.append((name, block.name, values.dtype.str, len(values), extra))
+    return columns, blocks
+
+def attach_frame(columns):
+    """Rebuild a DataFrame described by share_frame, returns (df, blocks)"""
+    data, blocks = {}, []
+    for name, block_name, dtype, length, extra in columns:
+        if block_name is None:
+            data[name] = extra[1]
+            continue
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        values = np.ndarray(length, dtype=np.dtype(dtype), buffer=block.buf)
+        if extra[0] == 'category':
+            data[name] = pd.Categorical.from_codes(values, categories=extra[1], ordered=extra[2])
+        elif extra[0] == 'datetime':
+            data[name] = values.view(extra[1])
+        else:
+            data[name] = values
+    return pd.DataFrame(data, copy=False), blocks
+
+# Shared blocks attached by this worker process, kept open while it runs
+_attached = []
+
+def init_worker(shared_frames):
+    """Pool initializer: Agg backend and the shared datasets seeded into the artifact cache"""
+    import matplotlib
+    matplotlib.use('Agg')
+    for path in (ML_DIR, PATTERN_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    for path, columns in shared_frames.items():
+        df, blocks = attach_frame(columns)
+        _attached.extend(blocks)
+        prime_dataset(path, df)
+
+def render(figure):
+    """Render one figure in a worker, returns (target, seconds, error)"""
+    module_name, function_name = figure.target.split(':')
+    os.chdir(figure.workdir)
+    for output in figure.outputs:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    start = time.perf_counter()
+    try:
+        getattr(importlib.import_module(module_name), function_name)()
+    except Exception as e:
+        return figure.target, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return figure.target, time.perf_counter() - start, None
+
+def fingerprint(figure):
+    """Hash of everything a figure depends on: its inputs, its source module and its outputs existing"""
+    module_file = os.path.join(figure.workdir, figure.target.split(':')[0] + '.py')
+    paths = [module_file]
+    for dataset in figure.datasets:
+        paths.extend(dataset_paths(os.path.join(figure.workdir, dataset)).values())
+    paths.extend(os.path.join(figure.workdir, model) for model in figure.models)
+
+    stamps = ArtifactCache.stamp(paths)
+    outputs = [os.path.exists(os.path.join(figure.workdir, output)) for output in figure.outputs]
+    return hashlib.sha256(json.dumps([stamps, outputs]).encode()).hexdigest()
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp = STATE_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+def run_pipeline(figures=FIGURES, workers=None, force=False):
+    """Render every stale figure in a process pool, returns {target: (status, seconds)}"""
+    state = {} if force else load_state()
+    fingerprints = {figure.target: fingerprint(figure) for figure in figures}
+    stale = [figure for figure in figures if state.get(figure.target) != fingerprints[figure.target]]
+    report = {figure.target: ('skipped', 0.0) for figure in figures if figure not in stale}
+    if not stale:
+        return report
+
+    # Each dataset is read once here and handed to the workers through shared memory
+    dataset_files = sorted({os.path.join(figure.workdir, dataset) for figure in stale for dataset in figure.datasets})
+    shared_frames, blocks = {}, []
+    try:
+        for path in dataset_files:
+            shared_frames[path], frame_blocks = share_frame(cached_dataset(path))
+            blocks.extend(frame_blocks)
+
+        workers = workers or min(len(stale), os.cpu_count() or 1)
+        # spawn keeps TensorFlow/OpenMP state of the parent out of the workers
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                 initargs=(shared_frames,)) as pool:
+            futures = [pool.submit(render, figure) for figure in stale]
+            for future in as_completed(futures):
+                target, seconds, error = future.result()
+                report[target] = ('rendered', seconds) if error is None else (f'failed ({error})', seconds)
+                print(f"  {target:<55}{report[target][0]:<10}{seconds:>8.2f}s")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    # Outputs exist now, so the stored fingerprints must be taken after rendering
+    for figure in stale:
+        if report[figure.target][0] == 'rendered':
+            state[figure.target] = fingerprint(figure)
+        else:
+            state.pop(figure.target, None)
+    save_state(state)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the analysis figures in parallel")
+    parser.add_argument('figures', nargs='*', help="Only render targets containing one of these names")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Render even if the inputs are unchanged")
+    args = parser.parse_args()
+
+    selected = [figure for figure in FIGURES
+                if not args.figures or any(name in figure.target for name in args.figures)]
+    print(f"Rendering {len(selected)} figures...")
+    start = time.perf_counter()
+    report = run_pipeline(selected, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+
+    rendered = sum(status == 'rendered' for status, _ in report.values())
+    skipped = sum(status == 'skipped' for status, _ in report.values())
+    failed = len(report) - rendered - skipped
+    print(f"\n{rendered} rendered, {skipped} unchanged, {failed} failed in {elapsed:.2f}s "
+          f"(render time {sum(seconds for _, seconds in report.values()):.2f}s)")
+    sys.exit(1 if failed else 0)
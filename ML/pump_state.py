@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from metrics import ClassCounts
+
+class RingBuffer:
+    """Preallocated circular buffer of fixed-dtype records"""
+
+    def __init__(self, capacity, dtype):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.written = 0
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def extend(self, records):
+        """Append a structured array of records, overwriting the oldest ones"""
+        records = records[-self.capacity:]
+        positions = (self.written + np.arange(len(records))) % self.capacity
+        self.data[positions] = records
+        self.written += len(records)
+
+    def last(self, n):
+        """The most recent n records, oldest first (only those n are copied)"""
+        n = min(n, len(self))
+        return self.data[(self.written - n + np.arange(n)) % self.capacity]
+
+VIBRATION_RECORD = np.dtype([('time', 'f8'), ('value', 'f8'), ('status', 'i1')])
+COOLING_RECORD = np.dtype([('time', 'f8'), ('inefficient', '?'), ('duration', 'f4'), ('reduction', 'f4')])
+
+class PumpState:
+    """History and prediction counts of a single pump"""
+
+    def __init__(self, history_length):
+        self.lock = threading.Lock()
+        self.vibration = RingBuffer(history_length, VIBRATION_RECORD)
+        self.cooling = RingBuffer(history_length, COOLING_RECORD)
+        self.status_counts = ClassCounts(range(3))
+        self.cooling_counts = ClassCounts(range(2))
+
+    def record(self, timestamp, vibrations, status_codes, inefficient, durations, reductions):
+        """Append a batch of scored readings"""
+        n = len(vibrations)
+        vibration_records = np.empty(n, dtype=VIBRATION_RECORD)
+        vibration_records['time'] = timestamp
+        vibration_records['value'] = vibrations
+        vibration_records['status'] = status_codes
+        cooling_records = np.empty(n, dtype=COOLING_RECORD)
+        cooling_records['time'] = timestamp
+        cooling_records['inefficient'] = inefficient
+        cooling_records['duration'] = durations
+        cooling_records['reduction'] = reductions
+
+        with self.lock:
+            self.vibration.extend(vibration_records)
+            self.cooling.extend(cooling_records)
+            self.status_counts.add_codes(status_codes)
+            self.cooling_counts.add_codes(inefficient)
+
+    def snapshot(self, n_vibration, n_cooling):
+        """Consistent copy of the recent history and the counts"""
+        with self.lock:
+            return (self.vibration.last(n_vibration), self.cooling.last(n_cooling),
+                    self.status_counts.snapshot(), self.cooling_counts.snapshot())
+
+class PumpStateStore:
+    """Per-pump state, created on the first reading of each pump
+
+    Holds at most max_pumps pumps (each costs two history_length ring
+    buffers); past that the least recently seen pump is dropped, so
+    client-supplied ids cannot grow memory without bound.
+    """
+
+    def __init__(self, history_length=4096, max_pumps=256):
+        self.history_length = history_length
+        self.max_pumps = max_pumps
+        self.pumps = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, pump_id):
+        with self.lock:
+            state = self.pumps.get(pump_id)
+            if state is None:
+                state = self.pumps[pump_id] = PumpState(self.history_length)
+                while len(self.pumps) > self.max_pumps:
+                    self.pumps.popitem(last=False)
+            else:
+                self.pumps.move_to_end(pump_id)
+        return state
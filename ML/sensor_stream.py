@@ -0,0 +1,256 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import urlparse
+import numpy as np
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:  # Replays still work without it
+    mqtt = None
+
+# Same names and meaning as the columns the cooling model was trained on
+FEATURE_NAMES = ['vibration', 'peak_vibration', 'stable_vibration',
+                 'cooling_duration', 'vibration_reduction', 'avg_vibration']
+
+class CoolingFeatureStream:
+    """Online cooling-cycle features of many pumps, O(1) work and state per sample
+
+    Every pump has one slot in a set of NumPy arrays, at most max_pumps of
+    them; a new pump past that takes over the slot of the least recently
+    seen one, which starts over at its next sample. A cycle starts with the
+    first sample of a pump, after a gap of more than cycle_gap seconds, or
+    when a sample rises above rise_ratio times the current stable level (the
+    motor heated up again). Within a cycle, as in the training data:
+
+    - vibration: level the cycle started from
+    - peak_vibration: running maximum
+    - stable_vibration: trend-corrected EWMA of the samples (alpha, beta),
+      the current level without the noise and without the lag a plain
+      EWMA has on a decaying curve
+    - vibration_reduction: (start - stable) / start
+    - cooling_duration: cycle minutes scaled by the reduction, which is how
+      generate_data.py derives it from the cooling curve
+    - avg_vibration: running mean
+    """
+
+    def __init__(self, capacity=64, alpha=0.2, beta=0.1, rise_ratio=1.3, cycle_gap=300.0, max_pumps=256):
+        self.alpha = alpha
+        self.beta = beta
+        self.rise_ratio = rise_ratio
+        self.cycle_gap = cycle_gap
+        self.max_pumps = max_pumps
+        self.slots = OrderedDict()
+        self.lock = threading.Lock()
+        self._allocate(min(capacity, max_pumps))
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'state', None)
+        self.state = {name: np.zeros(capacity) for name in
+                      ('start_time', 'last_time', 'initial', 'peak', 'stable', 'trend', 'total', 'count')}
+        if old is not None:
+            for name, values in old.items():
+                self.state[name][:len(values)] = values
+
+    def _slot(self, pump_id):
+        slot = self.slots.get(pump_id)
+        if slot is not None:
+            self.slots.move_to_end(pump_id)
+        elif len(self.slots) < self.max_pumps:
+            slot = len(self.slots)
+            if slot == len(self.state['count']):
+                self._allocate(min(2 * slot, self.max_pumps))
+            self.slots[pump_id] = slot
+        else:
+            _, slot = self.slots.popitem(last=False)
+            self.state['count'][slot] = 0  # The next sample starts a new cycle
+            self.slots[pump_id] = slot
+        return slot
+
+    def _features(self, slot):
+        s = self.state
+        initial, stable = s['initial'][slot], s['stable'][slot]
+        reduction = (initial - stable) / initial if initial else 0.0
+        minutes = (s['last_time'][slot] - s['start_time'][slot]) / 60
+        return np.array([initial, s['peak'][slot], stable, minutes * max(reduction, 0.0),
+                         reduction, s['total'][slot] / s['count'][slot]])
+
+    def update(self, pump_id, timestamp, vibration):
+        """Add one sample, returns the pump's features (FEATURE_NAMES order) after it"""
+        with self.lock:
+            slot = self._slot(pump_id)
+            s = self.state
+            new_cycle = (s['count'][slot] == 0
+                         or timestamp - s['last_time'][slot] > self.cycle_gap
+                         or vibration > self.rise_ratio * s['stable'][slot])
+            if new_cycle:
+                s['start_time'][slot] = timestamp
+                s['initial'][slot] = s['peak'][slot] = s['stable'][slot] = vibration
+                s['trend'][slot] = s['total'][slot] = 0.0
+                s['count'][slot] = 0
+            else:
+                s['peak'][slot] = max(s['peak'][slot], vibration)
+                previous = s['stable'][slot]
+                level = self.alpha * vibration + (1 - self.alpha) * (previous + s['trend'][slot])
+                s['trend'][slot] += self.beta * (level - previous - s['trend'][slot])
+                s['stable'][slot] = level
+            s['last_time'][slot] = timestamp
+            s['total'][slot] += vibration
+            s['count'][slot] += 1
+            return self._features(slot)
+
+    def update_many(self, pump_ids, timestamps, vibrations):
+        """Add samples in order, returns {feature name: array} with one row per sample"""
+        rows = np.array([self.update(p, t, v) for p, t, v in zip(pump_ids, timestamps, vibrations)])
+        return {name: rows[:, i] for i, name in enumerate(FEATURE_NAMES)}
+
+    def features(self, pump_id):
+        """Current features of a pump as a dict, None before its first sample"""
+        with self.lock:
+            slot = self.slots.get(pump_id)
+            if slot is None:
+                return None
+            return dict(zip(FEATURE_NAMES, self._features(slot).tolist()))
+
+def parse_timestamp(value):
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)  # ms epochs from the Node side
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+def parse_message(topic, payload):
+    """(pump_id, timestamp, vibration) of a sensors/<pump_id>[/...] message, None if it has no vibration
+
+    The payload is either a bare number or a JSON object with `vibration`
+    (or `value`) and optionally `timestamp` and `pump_id`.
+    """
+    try:
+        data = json.loads(payload) if isinstance(payload, (bytes, str)) else payload
+    except ValueError:
+        return None
+    parts = topic.split('/')
+    if isinstance(data, (int, float)):
+        if parts[-1] != 'vibration':
+            return None
+        data = {'vibration': data}
+    if not isinstance(data, dict):
+        return None
+    vibration = data.get('vibration', data.get('value') if parts[-1] == 'vibration' else None)
+    if vibration is None:
+        return None
+    pump_id = str(data.get('pump_id') or (parts[1] if len(parts) > 2 else 'default'))
+    return pump_id, parse_timestamp(data.get('timestamp')), float(vibration)
+
+class SensorIngest:
+    """Feeds raw sensor messages into a CoolingFeatureStream
+
+    on_message(topic, payload) is the single entry point, shared by the MQTT
+    client and file replays, so a recording exercises the same path as a broker.
+    """
+
+    def __init__(self, stream, on_features=None):
+        self.stream = stream
+        self.on_features = on_features
+        self.received = 0
+        self.ignored = 0
+
+    def on_message(self, topic, payload):
+        sample = parse_message(topic, payload)
+        if sample is None:
+            self.ignored += 1
+            return None
+        self.received += 1
+        features = self.stream.update(*sample)
+        if self.on_features is not None:
+            self.on_features(sample[0], sample[1], features)
+        return features
+
+def read_recording(path):
+    """(topic, payload) pairs of a JSONL recording, one {"topic", "payload"} object per line"""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                message = json.loads(line)
+                yield message['topic'], message['payload']
+
+def replay(path, ingest, speed=None):
+    """Feed a recording into ingest, as fast as possible or at `speed` times real time"""
+    previous = None
+    for topic, payload in read_recording(path):
+        if speed:
+            sample = parse_message(topic, payload)
+            if sample is not None:
+                if previous is not None:
+                    time.sleep(max(sample[1] - previous, 0) / speed)
+                previous = sample[1]
+        ingest.on_message(topic, payload)
+
+def connect_mqtt(on_message, broker_url, topic='sensors/#'):
+    """Call on_message(topic, payload) for every broker message, on a background network thread"""
+    if mqtt is None:
+        raise RuntimeError("paho-mqtt is required to read from a broker (pip install paho-mqtt)")
+    url = urlparse(broker_url)
+    if hasattr(mqtt, 'CallbackAPIVersion'):  # paho-mqtt >= 2
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    else:
+        client = mqtt.Client()
+    client.on_connect = lambda client, *args: client.subscribe(topic)
+    client.on_message = lambda client, userdata, message: on_message(message.topic, message.payload)
+    client.connect(url.hostname or 'localhost', url.port or 1883)
+    client.loop_start()
+    return client
+
+def start_ingest(stream, broker_url=None, replay_path=None):
+    """Start feeding stream from a recording or a broker, returns the SensorIngest"""
+    ingest = SensorIngest(stream)
+    if replay_path:
+        threading.Thread(target=replay, args=(replay_path, ingest), daemon=True,
+                         name='sensor-replay').start()
+    elif broker_url:
+        connect_mqtt(ingest.on_message, broker_url)
+    return ingest
+
+def record(broker_url, path, topic='sensors/#'):
+    """Append every message from the broker to a JSONL recording until interrupted"""
+    messages = queue.Queue()
+    connect_mqtt(lambda message_topic, payload: messages.put((message_topic, payload.decode())),
+                 broker_url, topic)
+    with open(path, 'a') as f:
+        while True:
+            message_topic, payload = messages.get()
+            f.write(json.dumps({'topic': message_topic, 'payload': payload}) + '\n')
+            f.flush()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute cooling features from sensor messages")
+    parser.add_argument('--replay', help="JSONL recording to replay")
+    parser.add_argument('--broker', help="MQTT broker URL, e.g. mqtt://localhost:1883")
+    parser.add_argument('--record', help="With --broker: append the raw messages to this JSONL file")
+    parser.add_argument('--speed', type=float, default=None, help="Replay at this multiple of real time")
+    args = parser.parse_args()
+
+    if args.broker and args.record:
+        record(args.broker, args.record)
+    elif args.replay:
+        stream = CoolingFeatureStream()
+        ingest = SensorIngest(stream)
+        start = time.perf_counter()
+        replay(args.replay, ingest, args.speed)
+        elapsed = time.perf_counter() - start
+        print(f"{ingest.received} samples ({ingest.ignored} ignored) in {elapsed:.2f}s, "
+              f"{ingest.received / max(elapsed, 1e-9):,.0f} samples/s")
+        for pump_id in stream.slots:
+            features = stream.features(pump_id)
+            print(pump_id, {name: round(value, 3) for name, value in features.items()})
+    elif args.broker:
+        ingest = SensorIngest(CoolingFeatureStream(), on_features=lambda pump_id, timestamp, features:
+                              print(pump_id, dict(zip(FEATURE_NAMES, np.round(features, 3).tolist()))))
+        connect_mqtt(ingest.on_message, args.broker)
+        threading.Event().wait()
+    else:
+        parser.print_help()
@@ -0,0 +1,198 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+import numpy as np
+
+# At most INFERENCE_WORKERS model calls run at once, so concurrent requests
+# cannot oversubscribe the CPU. Calls run on the request's own thread (XGBoost,
+# scikit-learn and NumPy release the GIL while predicting); the semaphore only
+# bounds them, nothing is handed to another thread or to the event loop.
+INFERENCE_WORKERS = int(os.environ.get('ML_INFERENCE_WORKERS', os.cpu_count() or 4))
+inference_slots = threading.BoundedSemaphore(INFERENCE_WORKERS)
+
+def run_inference(fn, *args):
+    """Run a model call once one of the INFERENCE_WORKERS slots is free"""
+    with inference_slots:
+        return fn(*args)
+
+def serve(app, port):
+    """Start a Flask app with the server selected by ML_SERVER
+
+    'flask' (default) is the development server used so far. 'asgi' wraps the
+    same WSGI app for uvicorn; each request runs synchronously, model calls
+    included, on one of ML_HTTP_WORKERS a2wsgi threads while the event loop
+    keeps accepting connections, so routes and JSON shapes are unchanged.
+    """
+    host = os.environ.get('ML_HOST', '0.0.0.0')
+    mode = os.environ.get('ML_SERVER', 'flask')
+    if mode == 'asgi':
+        import uvicorn
+        from a2wsgi import WSGIMiddleware
+        workers = int(os.environ.get('ML_HTTP_WORKERS', 4 * INFERENCE_WORKERS))
+        uvicorn.run(WSGIMiddleware(app, workers=workers), host=host, port=port,
+                    log_level=os.environ.get('ML_LOG_LEVEL', 'warning'))
+    elif mode == 'flask':
+        app.run(host=host, port=port, debug=True)
+    else:
+        raise ValueError(f"Unknown ML_SERVER mode: {mode}")
+
+class MicroBatcher:
+    """Coalesce concurrent single-request model calls into batched forward passes
+
+    Callers block in predict() while a background thread gathers queued inputs
+    for up to max_wait_ms (or until max_batch_size rows), runs predict_fn once
+    on the concatenated array and hands every caller its own rows back.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=2.0, name='batcher'):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.queue_latencies = deque(maxlen=1024)
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, x):
+        """Queue an input array (rows along axis 0) and return a Future for its output"""
+        future = Future()
+        self.queue.put((np.asarray(x), future, time.perf_counter()))
+        return future
+
+    def predict(self, x):
+        """Blocking call with the same contract as predict_fn(x)"""
+        return self.submit(x).result()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or stale"""
+        batch = [self.queue.get()]
+        rows = len(batch[0][0])
+        deadline = batch[0][2] + self.max_wait
+        while rows < self.max_batch_size:
+            # Past the deadline, still take whatever is already waiting
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                outputs = np.asarray(self.predict_fn(np.concatenate([x for x, _, _ in batch])))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for x, future, _ in batch:
+                future.set_result(outputs[offset:offset + len(x)])
+                offset += len(x)
+
+            with self.lock:
+                self.batches += 1
+                self.rows += offset
+                self.queue_latencies.extend(started - enqueued for _, _, enqueued in batch)
+
+    def metrics(self):
+        """Batch fill and queue latency since startup (latency over the last 1024 requests)"""
+        with self.lock:
+            latencies = np.array(self.queue_latencies) * 1e3
+            batches, rows = self.batches, self.rows
+        return {
+            'batches': batches,
+            'rows': rows,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1e3,
+            'mean_batch_size': rows / batches if batches else 0.0,
+            'batch_fill': rows / (batches * self.max_batch_size) if batches else 0.0,
+            'queue_latency_ms': {
+                'mean': float(latencies.mean()) if len(latencies) else 0.0,
+                'p50': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                'p99': float(np.percentile(latencies, 99)) if len(latencies) else 0.0
+            }
+        }
+
+class ResultCache:
+    """LRU/TTL memo of a deterministic endpoint, keyed on quantized features
+
+    Features are rounded to `decimals` places and the result is computed
+    from the rounded values, so every request that maps to a key gets the
+    same answer. Entries belong to one model version (e.g. the registry
+    stamp of its artifact); a new version drops all of them. max_entries=0
+    disables caching.
+    """
+
+    def __init__(self, max_entries=4096, ttl=300.0, decimals=3):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.decimals = decimals
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, version, features, compute):
+        """Cached compute(quantized_features) for the given model version"""
+        quantized = np.round(np.asarray(features, dtype=float), self.decimals)
+        if self.max_entries <= 0:
+            return compute(quantized)
+        key = tuple(quantized.ravel().tolist())
+        now = time.monotonic()
+        with self.lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+            entry = self.entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute(quantized)
+        with self.lock:
+            # A reload while computing makes this result stale, do not store it
+            if version == self.version:
+                self.entries[key] = (now, value)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_s': self.ttl,
+                'decimals': self.decimals,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,266 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import joblib
+import numpy as np
+from dataset_io import DATASET_SCHEMAS, iter_dataset, save_dataset
+from train_orchestrator import DATASETS, ML_DIR, MODEL_SPECS
+
+CHUNK_ROWS = int(os.environ.get('TRAIN_CHUNK_ROWS', 100_000))
+
+def test_mask(start, n, test_size, seed):
+    """Deterministic train/test assignment from the global row number alone
+
+    A multiplicative hash of the row number, so every pass over the stream
+    (training, rewinds by XGBoost, evaluation) puts a row on the same side
+    without keeping an index of the test rows.
+    """
+    rows = np.arange(start, start + n, dtype=np.uint64) + np.uint64(seed)
+    hashed = (rows * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(11)
+    return hashed / float(1 << 53) < test_size
+
+def target_values(column):
+    """Labels as a NumPy array, categories as their string values"""
+    return np.asarray(column.astype(object) if column.dtype == 'category' else column)
+
+def iter_chunks(model_name, part, path=None, test_size=0.2, seed=42, chunk_rows=CHUNK_ROWS):
+    """Yield (X, y) of the 'train' or 'test' rows of a model's dataset, one chunk at a time"""
+    spec = MODEL_SPECS[model_name]
+    start = 0
+    for df in iter_dataset(path or DATASETS[spec['dataset']][0],
+                           columns=spec['features'] + [spec['target']], chunk_rows=chunk_rows):
+        in_test = test_mask(start, len(df), test_size, seed)
+        start += len(df)
+        rows = in_test if part == 'test' else ~in_test
+        X = df[spec['features']].to_numpy(dtype=float)[rows]
+        if spec['positive'] is not None:
+            y = (df[spec['target']] == spec['positive']).to_numpy(dtype=int)[rows]
+        else:
+            y = target_values(df[spec['target']])[rows]
+        if len(y):
+            yield X, y
+
+def target_classes(model_name):
+    """Class labels of a model's target, None when only the data can tell"""
+    spec = MODEL_SPECS[model_name]
+    if spec['positive'] is not None:
+        return [0, 1]
+    stem = os.path.splitext(os.path.basename(DATASETS[spec['dataset']][0]))[0]
+    return DATASET_SCHEMAS.get(stem, {}).get('categorical', {}).get(spec['target'])
+
+def make_data_iter(chunks, cache_prefix=None):
+    """xgboost.DataIter over a restartable chunk source, also collecting the labels it saw"""
+    import xgboost as xgb
+
+    class ChunkIter(xgb.DataIter):
+        def __init__(self):
+            self.labels = set()
+            self.chunks = chunks()
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            X, y = chunk
+            self.labels.update(np.unique(y).tolist())
+            input_data(data=X, label=y)
+            return 1
+
+        def reset(self):
+            self.chunks = chunks()
+
+    return ChunkIter()
+
+def train_xgboost_streaming(model_name, path=None, external_memory=False, chunk_rows=CHUNK_ROWS,
+                            threads=None, seed=42):
+    """Fit an XGBoost model chunk by chunk
+
+    By default the chunks are quantised into a QuantileDMatrix, about one
+    byte per feature value instead of the eight of a float matrix. With
+    external_memory the pages go to a disk cache next to the data instead.
+    Returns an XGBClassifier, interchangeable with the in-memory one.
+    """
+    import xgboost as xgb
+    from xgboost import XGBClassifier
+
+    chunks = lambda: iter_chunks(model_name, 'train', path, chunk_rows=chunk_rows, seed=seed)
+    params = dict(MODEL_SPECS[model_name]['params'])
+    rounds = params.pop('n_estimators', 100)
+    params.update(tree_method='hist', seed=seed, nthread=threads or os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        data_iter = make_data_iter(chunks, os.path.join(cache_dir, 'pages') if external_memory else None)
+        dtrain = xgb.DMatrix(data_iter) if external_memory else xgb.QuantileDMatrix(data_iter, max_bin=256)
+        n_classes = len(data_iter.labels)
+        if n_classes > 2:
+            params.update(objective='multi:softprob', num_class=n_classes)
+        else:
+            params.update(objective='binary:logistic')
+        booster = xgb.train(params, dtrain, num_boost_round=rounds)
+    model = XGBClassifier()
+    model.load_model(bytearray(booster.save_raw('json')))
+    return model
+
+def train_forest_streaming(model_name, path=None, trees_per_chunk=10, chunk_rows=CHUNK_ROWS,
+                           threads=None, seed=42):
+    """Grow a RandomForest with warm_start, trees_per_chunk new trees per chunk
+
+    Each tree only sees its own chunk. A chunk that misses a class is held
+    back and merged with the next one, since every warm-started fit has to
+    see the same classes for the trees to vote on the same labels.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    classes = target_classes(model_name)
+    params = {k: v for k, v in MODEL_SPECS[model_name]['params'].items() if k != 'n_estimators'}
+    model = RandomForestClassifier(**params, n_estimators=0, warm_start=True,
+                                   n_jobs=threads, random_state=seed)
+    pending = []
+    for X, y in iter_chunks(model_name, 'train', path, chunk_rows=chunk_rows, seed=seed):
+        pending.append((X, y))
+        X = np.concatenate([p[0] for p in pending])
+        y = np.concatenate([p[1] for p in pending])
+        if classes is not None and len(np.unique(y)) < len(classes):
+            continue
+        model.n_estimators += trees_per_chunk
+        model.fit(X, y)
+        pending = []
+    if pending:
+        model.n_estimators += trees_per_chunk
+        model.fit(np.concatenate([p[0] for p in pending]), np.concatenate([p[1] for p in pending]))
+    return model
+
+def evaluate_streaming(model_name, model, path=None, chunk_rows=CHUNK_ROWS, seed=42):
+    """Accuracy over the test rows, without holding them all"""
+    correct = total = 0
+    for X, y in iter_chunks(model_name, 'test', path, chunk_rows=chunk_rows, seed=seed):
+        correct += int((model.predict(X) == y).sum())
+        total += len(y)
+    return correct / max(total, 1)
+
+def train_streaming(model_name, path=None, save=True, **options):
+    """Train, evaluate and (optionally) save one model from a chunked dataset"""
+    spec = MODEL_SPECS[model_name]
+    chunk_rows = options.get('chunk_rows', CHUNK_ROWS)
+    if spec['estimator'] == 'xgboost':
+        model = train_xgboost_streaming(model_name, path, **options)
+    elif spec['estimator'] == 'random_forest':
+        model = train_forest_streaming(model_name, path, **options)
+    else:
+        raise ValueError(f"{model_name} ({spec['estimator']}) has no streaming training mode")
+    accuracy = evaluate_streaming(model_name, model, path, chunk_rows, options.get('seed', 42))
+    if save:
+        os.makedirs(os.path.dirname(spec['artifacts'][0]), exist_ok=True)
+        joblib.dump(model, spec['artifacts'][0])
+        if model_name == 'cooling':
+            with open(spec['artifacts'][1], 'w') as f:
+                f.write('\n'.join(spec['features']))
+    return model, accuracy
+
+def train_full(model_name, path):
+    """The in-memory path of train_model.py / train_pattern_models.py, for comparison"""
+    from sklearn.model_selection import train_test_split
+    from dataset_io import load_dataset
+    from train_orchestrator import build_estimator
+
+    spec = MODEL_SPECS[model_name]
+    df = load_dataset(path, columns=spec['features'] + [spec['target']])
+    X = df[spec['features']].to_numpy(dtype=float)
+    if spec['positive'] is not None:
+        y = (df[spec['target']] == spec['positive']).to_numpy(dtype=int)
+    else:
+        y = target_values(df[spec['target']])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = build_estimator(spec, os.cpu_count(), 42)
+    model.fit(X_train, y_train)
+    return model, float(model.score(X_test, y_test))
+
+# Run in a fresh interpreter per path so the peak RSS of one does not hide the other
+BENCHMARK_SCRIPT = """
+import sys, time
+sys.path.insert(0, {ml_dir!r})
+import stream_train
+start = time.perf_counter()
+if {mode!r} == 'baseline':  # imports only, the floor both paths share
+    import xgboost, sklearn.ensemble
+    accuracy = float('nan')
+elif {mode!r} == 'full':
+    _, accuracy = stream_train.train_full({model!r}, {path!r})
+else:
+    _, accuracy = stream_train.train_streaming({model!r}, {path!r}, save=False, chunk_rows={chunk_rows},
+                                               **({options!r}))
+elapsed = time.perf_counter() - start
+with open('/proc/self/status') as f:
+    hwm = next(line.split()[1] for line in f if line.startswith('VmHWM'))
+print(elapsed, hwm, accuracy)
+"""
+
+def generate_rows(model_name, n_rows, seed=42):
+    """A synthetic copy of a model's dataset with n_rows rows"""
+    import generate_data
+    import generate_pattern_data
+
+    rng = np.random.default_rng(seed)
+    dataset = MODEL_SPECS[model_name]['dataset']
+    if dataset == 'vibration_data':
+        return generate_data.generate_vibration_data_vectorized(n_rows, rng=rng)
+    return generate_pattern_data.generate_load_pattern_data_vectorized(n_rows, rng=rng)
+
+def run_benchmark(model_names, n_rows, chunk_rows, fmt):
+    """Peak RSS and time of full-load vs streaming training on an n_rows dataset"""
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'model':<12}{'mode':<18}{'seconds':>10}{'peak RSS (MB)':>16}{'accuracy':>10}")
+        for model_name in model_names:
+            csv_name = os.path.basename(DATASETS[MODEL_SPECS[model_name]['dataset']][0])
+            path = os.path.join(tmp, model_name, csv_name)
+            if not os.path.exists(path):
+                save_dataset(generate_rows(model_name, n_rows), path, fmt)
+            modes = [('baseline', {}), ('full', {})]
+            if MODEL_SPECS[model_name]['estimator'] == 'xgboost':
+                modes += [('quantile', {}), ('external', {'external_memory': True})]
+            else:
+                modes += [('warm_start', {})]
+            for mode, options in modes:
+                script = BENCHMARK_SCRIPT.format(ml_dir=ML_DIR, mode=mode, model=model_name, path=path,
+                                                 chunk_rows=chunk_rows, options=options)
+                result = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                                        text=True, check=True, cwd=ML_DIR)
+                elapsed, hwm, accuracy = result.stdout.split()[-3:]
+                print(f"{model_name:<12}{mode:<18}{float(elapsed):>10.2f}"
+                      f"{int(hwm) / 1024:>16.0f}{float(accuracy):>10.3f}")
+
+if __name__ == "__main__":
+    streamable = [name for name, spec in MODEL_SPECS.items()
+                  if spec['estimator'] in ('xgboost', 'random_forest')]
+    parser = argparse.ArgumentParser(description="Train the tree models from a chunked dataset")
+    parser.add_argument('models', nargs='*', help=f"Models to train: {', '.join(streamable)} (default: all)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--external-memory', action='store_true',
+                        help="XGBoost: page the training data to disk instead of a QuantileDMatrix")
+    parser.add_argument('--trees-per-chunk', type=int, default=10, help="RandomForest trees added per chunk")
+    parser.add_argument('--benchmark', type=int, metavar='ROWS',
+                        help="Compare peak RSS with the full-load path on a synthetic dataset of ROWS rows")
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'feather'],
+                        help="Storage format of the benchmark dataset")
+    args = parser.parse_args()
+
+    unknown = set(args.models) - set(streamable)
+    if unknown:
+        parser.error(f"cannot stream: {', '.join(sorted(unknown))}")
+    model_names = args.models or streamable
+
+    if args.benchmark:
+        run_benchmark(model_names, args.benchmark, args.chunk_rows, args.format)
+        sys.exit(0)
+
+    for model_name in model_names:
+        options = {'chunk_rows': args.chunk_rows}
+        if MODEL_SPECS[model_name]['estimator'] == 'xgboost':
+            options['external_memory'] = args.external_memory
+        else:
+            options['trees_per_chunk'] = args.trees_per_chunk
+        _, accuracy = train_streaming(model_name, **options)
+        print(f"{model_name}: accuracy {accuracy:.2%} -> {MODEL_SPECS[model_name]['artifacts'][0]}")
+    print("\n✅ Models trained from the chunked datasets and saved")
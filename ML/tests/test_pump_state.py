@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ['HISTORY_DB'] = ''
+import app
+from pump_state import PumpStateStore
+
+def test_store_evicts_least_recently_seen():
+    store = PumpStateStore(16, max_pumps=2)
+    a = store.get('a')
+    store.get('b')
+    store.get('a')
+    store.get('c')
+    assert list(store.pumps) == ['a', 'c']
+    assert store.get('a') is a
+
+def test_batch_summaries_count_every_reading(monkeypatch):
+    monkeypatch.setattr(app, 'pump_states', PumpStateStore(16, max_pumps=3))
+    client = app.app.test_client()
+
+    readings = [{'vibration': 100 + i, 'pump_id': f'p{i % 3}'} for i in range(6)]
+    response = client.post('/predict_batch', json={'readings': readings})
+    assert response.status_code == 200
+    for summary in response.get_json()['pumps'].values():
+        assert sum(summary['counts']['status'].values()) == 2
+        assert sum(summary['counts']['cooling'].values()) == 2
+
+def test_batch_over_max_pumps_is_rejected(monkeypatch):
+    monkeypatch.setattr(app, 'pump_states', PumpStateStore(16, max_pumps=3))
+    readings = [{'vibration': 100, 'pump_id': f'p{i}'} for i in range(5)]
+    response = app.app.test_client().post('/predict_batch', json={'readings': readings})
+    assert response.status_code == 400
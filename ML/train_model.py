@@ -5,19 +5,23 @@ from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
+import sys
+from dataset_io import load_dataset
 
 def train_models():
     """Train both vibration and cooling efficiency models"""
+    cooling_features = ['vibration', 'peak_vibration', 'stable_vibration', 
+                       'cooling_duration', 'vibration_reduction', 'avg_vibration']
+    
     # Load data
-    data = pd.read_csv('data/vibration_data.csv')
+    data = load_dataset('data/vibration_data.csv',
+                        columns=cooling_features + ['label', 'cooling_efficiency'])
     
     # Prepare features for vibration model
     X_vibration = data[['vibration']].values
     y_vibration = data['label'].values
     
     # Prepare features for cooling model
-    cooling_features = ['vibration', 'peak_vibration', 'stable_vibration', 
-                       'cooling_duration', 'vibration_reduction', 'avg_vibration']
     X_cooling = data[cooling_features].values
     y_cooling = (data['cooling_efficiency'] == 'Efficient').astype(int)
     
@@ -79,4 +83,12 @@ def train_models():
     return vibration_model, cooling_model
 
 if __name__ == "__main__":
-    train_models()
+    # Read the dataset in chunks instead of loading it whole, for archives larger than RAM
+    if '--stream' in sys.argv:
+        from stream_train import train_streaming
+        for name in ['vibration', 'cooling']:
+            _, accuracy = train_streaming(name)
+            print(f"{name} model accuracy (streamed): {accuracy:.2%}")
+        print("\n Models trained and saved successfully!")
+    else:
+        train_models()
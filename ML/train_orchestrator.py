@@ -0,0 +1,353 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from importlib import metadata
+import joblib
+import numpy as np
+from artifact_cache import ArtifactCache
+from dataset_io import dataset_paths, load_dataset, save_dataset
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERN_DIR = os.path.join(ML_DIR, 'advanced_monitoring')
+CACHE_DIR = os.path.join(ML_DIR, '.train_cache')
+sys.path.insert(0, PATTERN_DIR)
+from usage_windows import USAGE_WINDOW, split_series, usage_series, window_dataset
+
+COOLING_FEATURES = ['vibration', 'peak_vibration', 'stable_vibration',
+                    'cooling_duration', 'vibration_reduction', 'avg_vibration']
+
+def generate_vibration(rng):
+    from generate_data import generate_vibration_data_vectorized
+    return generate_vibration_data_vectorized(1000, rng=rng)
+
+def generate_usage(rng):
+    from generate_pattern_data import generate_usage_pattern_data_vectorized
+    return generate_usage_pattern_data_vectorized(30, rng=rng)
+
+def generate_load(rng):
+    from generate_pattern_data import generate_load_pattern_data_vectorized
+    return generate_load_pattern_data_vectorized(1000, rng=rng)
+
+def generate_speed(rng):
+    from generate_pattern_data import generate_speed_optimization_data_vectorized
+    return generate_speed_optimization_data_vectorized(1000, rng=rng)
+
+# Dataset name -> (path, generator used when it is missing or --generate is given)
+DATASETS = {
+    'vibration_data': (os.path.join(ML_DIR, 'data', 'vibration_data.csv'), generate_vibration),
+    'usage_patterns': (os.path.join(PATTERN_DIR, 'data', 'vibration_usage_patterns.csv'), generate_usage),
+    'load_patterns': (os.path.join(PATTERN_DIR, 'data', 'vibration_load_patterns.csv'), generate_load),
+    'speed_data': (os.path.join(PATTERN_DIR, 'data', 'motor_speed_data.csv'), generate_speed),
+}
+
+# Everything that defines a model except `threads`, which only affects speed.
+# The target is `target` itself, or `target == positive` as 0/1.
+MODEL_SPECS = {
+    'vibration': {
+        'dataset': 'vibration_data', 'features': ['vibration'], 'target': 'label', 'positive': None,
+        'estimator': 'xgboost', 'params': {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 3},
+        'artifacts': [os.path.join(ML_DIR, 'models', 'vibration_model.joblib')], 'threads': 2
+    },
+    'cooling': {
+        'dataset': 'vibration_data', 'features': COOLING_FEATURES,
+        'target': 'cooling_efficiency', 'positive': 'Efficient',
+        'estimator': 'xgboost', 'params': {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 3},
+        'artifacts': [os.path.join(ML_DIR, 'models', 'cooling_model.joblib'),
+                      os.path.join(ML_DIR, 'models', 'cooling_features.txt')], 'threads': 2
+    },
+    'usage': {
+        'dataset': 'usage_patterns', 'features': ['Hour', 'Day', 'Vibration_Level', 'Usage_Frequency'],
+        'target': 'Usage_Label', 'positive': 'High Usage',
+        'estimator': 'lstm', 'params': {'units': 50, 'epochs': 20, 'batch_size': 32, 'window': USAGE_WINDOW},
+        'artifacts': [os.path.join(PATTERN_DIR, 'models', 'usage_prediction_model.h5'),
+                      os.path.join(PATTERN_DIR, 'models', 'usage_prediction_model.npz')], 'threads': 2
+    },
+    'load': {
+        'dataset': 'load_patterns', 'features': ['Vibration_Level', 'Motor_Current', 'Power_Consumption'],
+        'target': 'Load_Type', 'positive': None,
+        'estimator': 'random_forest', 'params': {'n_estimators': 100},
+        'artifacts': [os.path.join(PATTERN_DIR, 'models', 'load_classification_model.pkl')], 'threads': 2
+    },
+    'speed': {
+        'dataset': 'speed_data', 'features': ['Required_Flow_Rate', 'System_Pressure', 'Power_Consumption'],
+        'target': 'Optimal_Speed', 'positive': None,
+        'estimator': 'linear', 'params': {},
+        'artifacts': [os.path.join(PATTERN_DIR, 'models', 'speed_optimization_model.pkl')], 'threads': 1
+    },
+}
+
+LIBRARIES = {'xgboost': ['xgboost'], 'random_forest': ['scikit-learn'], 'linear': ['scikit-learn'],
+             'lstm': ['tensorflow', 'tensorflow-cpu']}
+
+def library_version(estimator):
+    """Installed version of the library behind an estimator, without importing it"""
+    for package in LIBRARIES[estimator]:
+        try:
+            return f"{package}=={metadata.version(package)}"
+        except metadata.PackageNotFoundError:
+            continue
+    return None
+
+def config_hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def atomic_copy(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.tmp{os.getpid()}"
+    shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+# Stage functions. Each returns (value, cached) and receives its dependencies' values.
+
+def stage_data(name, regenerate, seed):
+    path, generator = DATASETS[name]
+    cached = not regenerate and any(os.path.exists(p) for p in dataset_paths(path).values())
+    if not cached:
+        save_dataset(generator(np.random.default_rng(seed)), path)
+    return ArtifactCache.stamp(dataset_paths(path).values()), cached
+
+def stage_split(model_name, data_stamp, test_size, seed):
+    """Seeded train/test split, cached by dataset stamp and split config"""
+    from sklearn.model_selection import train_test_split
+    spec = MODEL_SPECS[model_name]
+    # The LSTM learns from windows of consecutive readings, so its split is
+    # time-ordered instead of shuffled
+    window = spec['params'].get('window') if spec['estimator'] == 'lstm' else None
+    key = config_hash(data_stamp, spec['features'], spec['target'], spec['positive'], test_size, seed, window)
+    path = os.path.join(CACHE_DIR, 'splits', f'{key}.npz')
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=True) as f:
+            return {'key': key, **{name: f[name] for name in f.files}}, True
+
+    if window is not None:
+        df = load_dataset(DATASETS[spec['dataset']][0], columns=['Timestamp'] + spec['features'] + [spec['target']])
+        (X_train, y_train), (X_test, y_test) = split_series(*usage_series(df), window, test_size)
+    else:
+        df = load_dataset(DATASETS[spec['dataset']][0], columns=spec['features'] + [spec['target']])
+        X = df[spec['features']].to_numpy(dtype=float)
+        if spec['positive'] is not None:
+            y = (df[spec['target']] == spec['positive']).astype(int).to_numpy()
+        else:
+            y = np.asarray(df[spec['target']].astype(object) if df[spec['target']].dtype == 'category'
+                           else df[spec['target']])
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+    split = {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}.npz"
+    np.savez(tmp, **split)
+    os.replace(tmp, path)
+    return {'key': key, **split}, False
+
+def fit_lstm(spec, split, threads, seed):
+    import tensorflow as tf
+    from tensorflow.keras.layers import LSTM, Dense
+    from tensorflow.keras.models import Sequential
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:  # TensorFlow was already initialized by an earlier fit
+        pass
+    tf.keras.utils.set_random_seed(seed)
+    params = spec['params']
+    train_data = window_dataset(split['X_train'], split['y_train'], params['window'],
+                                batch_size=params['batch_size'], shuffle=True, seed=seed)
+    model = Sequential([
+        LSTM(params['units'], activation='relu', input_shape=(params['window'], split['X_train'].shape[1])),
+        Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    model.fit(train_data, epochs=params['epochs'], verbose=0)
+    return model
+
+def build_estimator(spec, threads, seed):
+    if spec['estimator'] == 'xgboost':
+        from xgboost import XGBClassifier
+        return XGBClassifier(**spec['params'], n_jobs=threads, random_state=seed)
+    if spec['estimator'] == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(**spec['params'], n_jobs=threads, random_state=seed)
+    if spec['estimator'] == 'linear':
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**spec['params'])
+    raise ValueError(f"Unknown estimator: {spec['estimator']}")
+
+def stage_fit(model_name, split, threads, seed):
+    """Fit a model, or reuse the cached artifacts of an identical config"""
+    spec = MODEL_SPECS[model_name]
+    described = {k: v for k, v in spec.items() if k not in ('threads', 'artifacts')}
+    key = config_hash(split['key'], described, seed, library_version(spec['estimator']))
+    bundle = os.path.join(CACHE_DIR, 'artifacts', f'{model_name}-{key}')
+    if os.path.exists(os.path.join(bundle, 'metrics.json')):
+        return {'key': key, 'bundle': bundle, 'model': None}, True
+
+    if spec['estimator'] == 'lstm':
+        model = fit_lstm(spec, split, threads, seed)
+    else:
+        model = build_estimator(spec, threads, seed)
+        model.fit(split['X_train'], split['y_train'])
+    return {'key': key, 'bundle': bundle, 'model': model}, False
+
+def stage_evaluate(model_name, split, fit):
+    if fit['model'] is None:
+        with open(os.path.join(fit['bundle'], 'metrics.json'), 'r') as f:
+            return json.load(f), True
+    spec = MODEL_SPECS[model_name]
+    model, X_test, y_test = fit['model'], split['X_test'], split['y_test']
+    if spec['estimator'] == 'lstm':
+        window = spec['params']['window']
+        predictions = (model.predict(window_dataset(X_test, window=window, batch_size=256), verbose=0) > 0.5)
+        return {'accuracy': float(np.mean(predictions.astype(int).ravel() == y_test[window - 1:]))}, False
+    if spec['estimator'] == 'linear':
+        return {'r2': float(model.score(X_test, y_test))}, False
+    return {'accuracy': float(model.score(X_test, y_test))}, False
+
+def write_bundle(model_name, fit, metrics):
+    """Write the artifacts and metrics of a fresh fit into its cache directory"""
+    spec = MODEL_SPECS[model_name]
+    tmp = f"{fit['bundle']}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for artifact in spec['artifacts']:
+        target = os.path.join(tmp, os.path.basename(artifact))
+        if artifact.endswith('.h5'):
+            fit['model'].save(target)
+        elif artifact.endswith('.npz'):
+            from train_pattern_models import export_usage_model_weights
+            export_usage_model_weights(fit['model'], target)
+        elif artifact.endswith('.txt'):
+            with open(target, 'w') as f:
+                f.write('\n'.join(spec['features']))
+        else:
+            joblib.dump(fit['model'], target)
+    with open(os.path.join(tmp, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    shutil.rmtree(fit['bundle'], ignore_errors=True)
+    os.replace(tmp, fit['bundle'])
+
+def stage_save(model_name, fit, metrics):
+    """Cache a fresh fit, then install its artifacts where the apps load them"""
+    cached = fit['model'] is None
+    if not cached:
+        write_bundle(model_name, fit, metrics)
+    for artifact in MODEL_SPECS[model_name]['artifacts']:
+        atomic_copy(os.path.join(fit['bundle'], os.path.basename(artifact)), artifact)
+    return MODEL_SPECS[model_name]['artifacts'], cached
+
+class Orchestrator:
+    """Run a DAG of stages on a thread pool within a CPU thread budget
+
+    A stage starts once its dependencies are done and its thread count fits
+    in what is left of the budget (a stage wider than the whole budget runs
+    alone). Failures skip everything downstream.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.stages = {}
+        self.timings = {}
+
+    def add(self, name, fn, deps=(), threads=1):
+        self.stages[name] = {'fn': fn, 'deps': list(deps), 'threads': threads}
+
+    def run(self):
+        results, status = {}, {}
+        pending = list(self.stages)
+        running = {}
+        used = 0
+        lock = threading.Lock()
+
+        def execute(name):
+            stage = self.stages[name]
+            start = time.perf_counter()
+            value, cached = stage['fn'](*[results[dep] for dep in stage['deps']])
+            with lock:
+                self.timings[name] = (time.perf_counter() - start, cached)
+            return value
+
+        with ThreadPoolExecutor(max_workers=max(len(self.stages), 1)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name]['deps']
+                    if any(status.get(dep) in ('failed', 'skipped') for dep in deps):
+                        status[name] = 'skipped'
+                        pending.remove(name)
+                        continue
+                    threads = min(self.stages[name]['threads'], self.budget)
+                    if all(status.get(dep) == 'done' for dep in deps) and used + threads <= self.budget:
+                        running[pool.submit(execute, name)] = (name, threads)
+                        used += threads
+                        pending.remove(name)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, threads = running.pop(future)
+                    used -= threads
+                    try:
+                        results[name] = future.result()
+                        status[name] = 'done'
+                    except Exception as e:
+                        status[name] = 'failed'
+                        print(f"❌ {name} failed: {type(e).__name__}: {e}")
+        return results, status
+
+def build_dag(model_names, budget, regenerate=False, test_size=0.2, seed=42):
+    dag = Orchestrator(budget)
+    for dataset in sorted({MODEL_SPECS[name]['dataset'] for name in model_names}):
+        dag.add(f'data:{dataset}', lambda dataset=dataset: stage_data(dataset, regenerate, seed))
+    for name in model_names:
+        spec = MODEL_SPECS[name]
+        threads = min(spec['threads'], budget)
+        dag.add(f'split:{name}', lambda stamp, name=name: stage_split(name, stamp, test_size, seed),
+                [f"data:{spec['dataset']}"])
+        dag.add(f'fit:{name}', lambda split, name=name, threads=threads: stage_fit(name, split, threads, seed),
+                [f'split:{name}'], threads=threads)
+        dag.add(f'evaluate:{name}', lambda split, fit, name=name: stage_evaluate(name, split, fit),
+                [f'split:{name}', f'fit:{name}'])
+        dag.add(f'save:{name}', lambda fit, metrics, name=name: stage_save(name, fit, metrics),
+                [f'fit:{name}', f'evaluate:{name}'])
+    return dag
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train all models as a parallel, cached DAG")
+    parser.add_argument('models', nargs='*', help=f"Models to train: {', '.join(MODEL_SPECS)} (default: all)")
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help="CPU thread budget")
+    parser.add_argument('--generate', action='store_true', help="Regenerate the datasets first")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-cache', action='store_true', help="Ignore cached splits and fits")
+    parser.add_argument('--params', help="JSON of per-model parameter overrides, e.g. from tune_models.py")
+    args = parser.parse_args()
+
+    unknown = set(args.models) - set(MODEL_SPECS)
+    if unknown:
+        parser.error(f"unknown models: {', '.join(sorted(unknown))}")
+    if args.params:
+        with open(args.params, 'r') as f:
+            for name, params in json.load(f).items():
+                MODEL_SPECS[name]['params'].update(params)
+    if args.no_cache:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    model_names = args.models or list(MODEL_SPECS)
+    dag = build_dag(model_names, args.threads, args.generate, seed=args.seed)
+
+    start = time.perf_counter()
+    results, status = dag.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'stage':<28}{'status':<10}{'seconds':>10}")
+    for name in dag.stages:
+        seconds, cached = dag.timings.get(name, (0.0, False))
+        label = 'cached' if status.get(name) == 'done' and cached else status.get(name, 'skipped')
+        print(f"{name:<28}{label:<10}{seconds:>10.2f}")
+    stage_total = sum(seconds for seconds, _ in dag.timings.values())
+    print(f"\nWall time {elapsed:.2f}s for {stage_total:.2f}s of stage time ({args.threads} threads)")
+    for name in model_names:
+        if f'evaluate:{name}' in results:
+            print(f"  {name}: {results[f'evaluate:{name}']}")
+    sys.exit(0 if all(s == 'done' for s in status.values()) else 1)
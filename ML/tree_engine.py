@@ -0,0 +1,217 @@
+import json
+import numpy as np
+
+class CompiledTrees:
+    """Flat, array-backed copy of an XGBoost tree ensemble evaluated with NumPy
+
+    Every tree of the booster is concatenated into one set of node arrays, so a
+    prediction is max_depth vectorized gathers over (rows x trees) instead of a
+    call into the XGBClassifier wrapper. This pays off for the small inputs the
+    serving apps score per request; large batches are still faster through the
+    booster's own multithreaded predictor.
+    """
+
+    def __init__(self, left, right, feature, threshold, value, default_left,
+                 roots, tree_group, n_groups, base_margin, objective, n_features, depth):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.default_left = default_left
+        self.roots = roots
+        self.tree_group = tree_group
+        self.n_groups = n_groups
+        self.base_margin = base_margin
+        self.objective = objective
+        self.n_features = n_features
+        self.depth = depth
+        # Trees are stored round-robin per class, so the (rows x trees) leaf
+        # values reshape to (rows x rounds x classes) and sum over rounds
+        self.grouped = bool(np.array_equal(
+            tree_group, np.tile(np.arange(n_groups), len(roots) // n_groups)))
+
+    @classmethod
+    def from_model(cls, model):
+        """Compile a fitted XGBClassifier (or a raw Booster)"""
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        return cls.from_json(json.loads(booster.save_raw(raw_format='json')))
+
+    @classmethod
+    def from_json(cls, model_json):
+        """Compile from the JSON document written by Booster.save_raw/save_model"""
+        learner = model_json['learner']
+        params = learner['learner_model_param']
+        objective = learner['objective']['name']
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster: {learner['gradient_booster']['name']}")
+        if objective not in ('binary:logistic', 'multi:softprob', 'multi:softmax'):
+            raise ValueError(f"Unsupported objective: {objective}")
+
+        model = learner['gradient_booster']['model']
+        trees = model['trees']
+        n_groups = max(int(params['num_class']), 1)
+        base_score = np.float32(float(params['base_score']))
+        if objective == 'binary:logistic':
+            # Stored in probability space, the trees are fitted on the logit
+            base_margin = np.float32(-np.log(np.float32(1) / base_score - np.float32(1)))
+        else:
+            base_margin = base_score
+
+        left, right, feature, threshold, value, default_left, roots = [], [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported")
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+            nodes = np.arange(len(tree_left)) + offset
+            is_leaf = tree_left == -1
+            # Leaves point at themselves so every row can take depth steps
+            left.append(np.where(is_leaf, nodes, tree_left + offset))
+            right.append(np.where(is_leaf, nodes, tree_right + offset))
+            feature.append(np.where(is_leaf, 0, tree['split_indices']))
+            threshold.append(np.asarray(tree['split_conditions'], dtype=np.float32))
+            value.append(np.where(is_leaf, np.asarray(tree['split_conditions'], dtype=np.float32), 0))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            roots.append(offset)
+            depth = max(depth, cls._tree_depth(tree_left, tree_right))
+            offset += len(tree_left)
+
+        return cls(
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold),
+            value=np.concatenate(value).astype(np.float32),
+            default_left=np.concatenate(default_left),
+            roots=np.asarray(roots, dtype=np.int64),
+            tree_group=np.asarray(model['tree_info'], dtype=np.intp),
+            n_groups=n_groups,
+            base_margin=base_margin,
+            objective=objective,
+            n_features=int(params['num_feature']),
+            depth=depth
+        )
+
+    @staticmethod
+    def _tree_depth(left, right):
+        """Longest root-to-leaf path of a single tree"""
+        depth = np.zeros(len(left), dtype=np.int64)
+        for node in range(len(left)):  # Children always come after their parent
+            if left[node] != -1:
+                depth[left[node]] = depth[right[node]] = depth[node] + 1
+        return int(depth.max())
+
+    def leaf_values(self, X):
+        """Leaf output of every tree for every row, shape (rows, trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(x), self.default_left[nodes], x < self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes]
+
+    def predict_margin(self, X):
+        """Raw scores, shape (rows,) for binary and (rows, classes) for multiclass"""
+        values = self.leaf_values(X)
+        if self.grouped:
+            values = values.reshape(len(values), -1, self.n_groups)
+        else:
+            values = np.stack([values[:, self.tree_group == group]
+                               for group in range(self.n_groups)], axis=2)
+        # Accumulate base score first and then each tree in order, in float32,
+        # which is what the XGBoost CPU predictor does. cumsum is strictly
+        # sequential (sum() is pairwise), so the margins match bit for bit.
+        base = np.full((len(values), 1, self.n_groups), self.base_margin, dtype=np.float32)
+        margin = np.cumsum(np.concatenate([base, values], axis=1), axis=1, dtype=np.float32)[:, -1]
+        return margin[:, 0] if self.objective == 'binary:logistic' else margin
+
+    def predict_proba(self, X):
+        """Class probabilities in the same layout as XGBClassifier.predict_proba"""
+        margin = self.predict_margin(X)
+        if self.objective == 'binary:logistic':
+            positive = np.float32(1) / (np.float32(1) + np.exp(-margin))
+            return np.column_stack([np.float32(1) - positive, positive])
+        exp = np.exp(margin - margin.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        """Class labels in the same layout as XGBClassifier.predict"""
+        margin = self.predict_margin(X)
+        if self.objective == 'binary:logistic':
+            return (margin > 0).astype(np.int64)
+        return margin.argmax(axis=1)
+
+def check_parity(model, compiled, X):
+    """Return the number of rows where the compiled trees disagree with the model"""
+    X = np.asarray(X, dtype=np.float32)
+    return int(np.count_nonzero(model.predict(X) != compiled.predict(X)))
+
+class ThresholdLookup:
+    """Sorted split-threshold index for ensembles that split on a single feature
+
+    Such a model is piecewise constant between consecutive split thresholds,
+    so it can be tabulated once and evaluated with one np.searchsorted.
+    """
+
+    def __init__(self, thresholds, labels, nan_label):
+        self.thresholds = thresholds
+        self.labels = labels
+        self.nan_label = nan_label
+
+    @classmethod
+    def from_model(cls, model):
+        """Tabulate a fitted single-feature XGBClassifier (or a CompiledTrees)"""
+        compiled = model if isinstance(model, CompiledTrees) else CompiledTrees.from_model(model)
+        if compiled.n_features != 1:
+            raise ValueError(f"Lookup needs a single-feature model, got {compiled.n_features} features")
+
+        internal = compiled.left != np.arange(len(compiled.left))
+        thresholds = np.unique(compiled.threshold[internal])
+        # Interval i is [thresholds[i - 1], thresholds[i]); x < t goes left, so
+        # the lower bound itself lands in the interval. The first interval is
+        # open below, probe it just under the smallest threshold.
+        probes = np.concatenate([[np.nextafter(thresholds[0], np.float32(-np.inf))], thresholds])
+        labels = compiled.predict(probes.reshape(-1, 1))
+        nan_label = compiled.predict(np.array([[np.nan]], dtype=np.float32))[0]
+
+        # Only keep the thresholds where the predicted class actually changes
+        changes = np.flatnonzero(labels[1:] != labels[:-1])
+        return cls(thresholds[changes], labels[np.concatenate([[0], changes + 1])], nan_label)
+
+    def predict(self, X):
+        """Class labels in the same layout as XGBClassifier.predict"""
+        x = np.asarray(X, dtype=np.float32).reshape(-1)
+        labels = self.labels[np.searchsorted(self.thresholds, x, side='right')]
+        nan = np.isnan(x)
+        if nan.any():
+            labels[nan] = self.nan_label
+        return labels
+
+def check_lookup(model, lookup):
+    """Return the number of boundary probes where the lookup disagrees with the model
+
+    Both are constant between the model's split thresholds, so comparing them
+    on every threshold, its float32 neighbours and the open ends covers the
+    whole real line.
+    """
+    compiled = CompiledTrees.from_model(model)
+    internal = compiled.left != np.arange(len(compiled.left))
+    thresholds = np.unique(compiled.threshold[internal])
+    probes = np.concatenate([
+        thresholds,
+        np.nextafter(thresholds, np.float32(-np.inf)),
+        np.nextafter(thresholds, np.float32(np.inf)),
+        np.array([-np.inf, np.inf, np.finfo(np.float32).min, np.finfo(np.float32).max, np.nan],
+                 dtype=np.float32)
+    ]).reshape(-1, 1)
+    return check_parity(model, lookup, probes)
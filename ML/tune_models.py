@@ -0,0 +1,191 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from sklearn.model_selection import train_test_split
+from train_orchestrator import MODEL_SPECS, stage_data, stage_split
+
+# Sampled per trial; n_estimators is the resource successive halving allocates
+SEARCH_SPACES = {
+    'xgboost': {
+        'max_depth': lambda rng: int(rng.integers(2, 9)),
+        'learning_rate': lambda rng: float(np.exp(rng.uniform(np.log(0.03), np.log(0.3)))),
+        'subsample': lambda rng: float(rng.uniform(0.6, 1.0)),
+        'colsample_bytree': lambda rng: float(rng.uniform(0.6, 1.0)),
+        'min_child_weight': lambda rng: int(rng.integers(1, 11)),
+    },
+    'random_forest': {
+        'max_depth': lambda rng: [None, 4, 6, 8, 12, 16][rng.integers(6)],
+        'min_samples_leaf': lambda rng: int(rng.integers(1, 11)),
+        'max_features': lambda rng: ['sqrt', None, 0.5][rng.integers(3)],
+    },
+}
+
+def build(estimator, params, n_estimators, seed):
+    if estimator == 'xgboost':
+        from xgboost import XGBClassifier
+        return XGBClassifier(**params, n_estimators=n_estimators, tree_method='hist',
+                             early_stopping_rounds=10, n_jobs=1, random_state=seed)
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**params, n_estimators=n_estimators, n_jobs=1, random_state=seed)
+
+def latency_per_row(model, X, rows=1024, repeats=5):
+    """Median batch predict time per row in microseconds"""
+    batch = np.resize(X, (rows, X.shape[1]))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) / rows * 1e6
+
+def smallest_forest(model, X_stop, y_stop):
+    """Drop trailing trees that do not change accuracy on X_stop, RandomForest's early stopping"""
+    votes = np.cumsum([tree.predict_proba(X_stop) for tree in model.estimators_], axis=0)
+    accuracy = (model.classes_[votes.argmax(axis=2)] == np.asarray(y_stop)).mean(axis=1)
+    n_estimators = int(np.argmax(accuracy >= accuracy[-1])) + 1
+    model.estimators_ = model.estimators_[:n_estimators]
+    model.n_estimators = n_estimators
+    return n_estimators
+
+class Trial:
+    """One sampled configuration and its result at the last budget it ran with"""
+
+    def __init__(self, params):
+        self.params = params
+        self.budget = 0
+        self.n_estimators = 0
+        self.accuracy = 0.0
+        self.latency_us = float('inf')
+        self.model = None
+
+    def score(self, latency_weight):
+        return self.accuracy - latency_weight * self.latency_us
+
+    def describe(self):
+        return {'params': self.params, 'n_estimators': self.n_estimators,
+                'val_accuracy': self.accuracy, 'latency_us_per_row': self.latency_us}
+
+def run_trial(trial, estimator, budget, data, seed):
+    model = build(estimator, trial.params, budget, seed)
+    if estimator == 'xgboost':
+        model.fit(data['X_fit'], data['y_fit'], eval_set=[(data['X_stop'], data['y_stop'])], verbose=False)
+        # Early stopping may use fewer rounds than the budget; serve only those
+        n_estimators = model.best_iteration + 1
+        if n_estimators < budget:
+            model = build(estimator, trial.params, n_estimators, seed)
+            model.set_params(early_stopping_rounds=None)
+            model.fit(data['X_fit'], data['y_fit'], verbose=False)
+    else:
+        model.fit(data['X_fit'], data['y_fit'])
+        n_estimators = smallest_forest(model, data['X_stop'], data['y_stop'])
+    trial.budget = budget
+    trial.n_estimators = n_estimators
+    trial.accuracy = float(model.score(data['X_val'], data['y_val']))
+    trial.model = model
+    return trial
+
+def successive_halving(trials, estimator, min_budget, max_budget, eta, data, pool, latency_weight, seed):
+    """Train all trials on a small budget, keep the best 1/eta, multiply the budget by eta, repeat"""
+    budget = min_budget
+    while True:
+        list(pool.map(lambda trial: run_trial(trial, estimator, budget, data, seed), trials))
+        # Timed one at a time once the rung's fits are done, so the latency
+        # is the model's and not contention with other trials still fitting
+        for trial in trials:
+            trial.latency_us = latency_per_row(trial.model, data['X_val'])
+        trials.sort(key=lambda trial: trial.score(latency_weight), reverse=True)
+        if budget >= max_budget or len(trials) <= 1:
+            return trials
+        trials = trials[:max(1, len(trials) // eta)]
+        budget = min(budget * eta, max_budget)
+
+def hyperband(estimator, data, max_budget=400, min_budget=10, eta=3, workers=1, latency_weight=0.0, seed=42):
+    """Hyperband brackets of successive halving, returns every trial that reached the full budget"""
+    rng = np.random.default_rng(seed)
+    s_max = int(math.log(max_budget / min_budget, eta))
+    finalists = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            bracket_budget = max(min_budget, int(max_budget * eta ** -s))
+            trials = [Trial({name: sample(rng) for name, sample in SEARCH_SPACES[estimator].items()})
+                      for _ in range(n)]
+            survivors = successive_halving(trials, estimator, bracket_budget, max_budget, eta,
+                                           data, pool, latency_weight, seed)
+            finalists.extend(trial for trial in survivors if trial.budget >= max_budget)
+    return finalists
+
+def select(finalists, min_accuracy, latency_weight):
+    """Fastest finalist meeting min_accuracy, else the best latency-weighted score"""
+    eligible = [trial for trial in finalists if trial.accuracy >= min_accuracy]
+    if eligible:
+        return min(eligible, key=lambda trial: (trial.latency_us, -trial.accuracy))
+    return max(finalists, key=lambda trial: trial.score(latency_weight))
+
+def tune(model_name, min_accuracy, latency_weight, max_budget, eta, workers, seed):
+    spec = MODEL_SPECS[model_name]
+    stamp, _ = stage_data(spec['dataset'], False, seed)
+    split, _ = stage_split(model_name, stamp, 0.2, seed)
+    # The training rows are split three ways: fitting, a stopping slice that
+    # picks the number of trees (XGBoost early stopping, forest truncation)
+    # and a validation slice that scores trials. Scoring on the rows the tree
+    # count was picked on would overstate accuracy. The test rows only score
+    # the final choice.
+    X_fit, X_held, y_fit, y_held = train_test_split(split['X_train'], split['y_train'],
+                                                    test_size=0.4, random_state=seed)
+    X_stop, X_val, y_stop, y_val = train_test_split(X_held, y_held, test_size=0.5, random_state=seed)
+    data = {'X_fit': X_fit, 'y_fit': y_fit, 'X_stop': X_stop, 'y_stop': y_stop, 'X_val': X_val, 'y_val': y_val}
+
+    start = time.perf_counter()
+    finalists = hyperband(spec['estimator'], data, max_budget, eta=eta, workers=workers,
+                          latency_weight=latency_weight, seed=seed)
+    best = select(finalists, min_accuracy, latency_weight)
+    result = best.describe()
+    result['test_accuracy'] = float(best.model.score(split['X_test'], split['y_test']))
+    result['trials'] = len(finalists)
+    result['seconds'] = time.perf_counter() - start
+
+    params = dict(best.params, n_estimators=best.n_estimators)
+    if spec['estimator'] == 'xgboost':
+        params['tree_method'] = 'hist'
+    return params, result
+
+if __name__ == "__main__":
+    tunable = [name for name, spec in MODEL_SPECS.items() if spec['estimator'] in SEARCH_SPACES]
+    parser = argparse.ArgumentParser(description="Latency-aware Hyperband search for the tree models")
+    parser.add_argument('models', nargs='*', help=f"Models to tune: {', '.join(tunable)} (default: all)")
+    parser.add_argument('--min-accuracy', type=float, default=0.98,
+                        help="Pick the fastest finalist with at least this validation accuracy")
+    parser.add_argument('--latency-weight', type=float, default=0.001,
+                        help="Accuracy given up per microsecond of inference time per row")
+    parser.add_argument('--max-estimators', type=int, default=400)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='models/tuned_params.json',
+                        help="Chosen params, for train_orchestrator.py --params")
+    args = parser.parse_args()
+
+    unknown = set(args.models) - set(tunable)
+    if unknown:
+        parser.error(f"cannot tune: {', '.join(sorted(unknown))}")
+
+    tuned = {}
+    for model_name in args.models or tunable:
+        print(f"\nTuning {model_name} ({MODEL_SPECS[model_name]['estimator']})...")
+        params, result = tune(model_name, args.min_accuracy, args.latency_weight,
+                              args.max_estimators, args.eta, args.workers, args.seed)
+        tuned[model_name] = params
+        print(f"  {result['trials']} finalists in {result['seconds']:.1f}s")
+        print(f"  chosen: {params}")
+        print(f"  val accuracy {result['val_accuracy']:.4f}, test accuracy {result['test_accuracy']:.4f}, "
+              f"{result['latency_us_per_row']:.2f} us/row")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(tuned, f, indent=2)
+    print(f"\n✅ Tuned parameters saved to {args.output}")
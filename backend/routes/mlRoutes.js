@@ -103,12 +103,15 @@ router.post('/predict-speed', async (req, res) => {
 // Start/Stop Analysis
 router.post('/analyze-start-stop', async (req, res) => {
   try {
-    const { timestamp } = req.body;
-    console.log('Received start/stop analysis request:', { timestamp });
-
-    const data = {
-      Vibration_Change: 30 + Math.random() * 40 // Simulated vibration change
-    };
+    const { timestamp, pumpId, timestamps, vibrations, reset } = req.body;
+    console.log('Received start/stop analysis request:', { timestamp, pumpId });
+
+    // Without a vibration series the ML service reads the pump's recorded history
+    const data = { Pump_ID: pumpId || 'default', Reset: Boolean(reset) };
+    if (Array.isArray(vibrations)) {
+      data.Vibration_Level = vibrations;
+      if (Array.isArray(timestamps)) data.Timestamp = timestamps;
+    }
 
     console.log('Sending request to ML service:', `${ML_SERVICE_URL}/analyze_start_stop`, data);
     const response = await axios.post(`${ML_SERVICE_URL}/analyze_start_stop`, data);
@@ -116,7 +119,11 @@ router.post('/analyze-start-stop', async (req, res) => {
 
     res.json({
       Pattern: response.data.Start_Stop_Status,
-      Recommendations: response.data.Recommendation
+      Recommendations: response.data.Recommendation,
+      StartsLastHour: response.data.Starts_Last_Hour,
+      MaxStartsPerHour: response.data.Max_Starts_Per_Hour,
+      MotorState: response.data.Motor_State,
+      Alerts: response.data.Alerts
     });
   } catch (error) {
     console.error('Start/Stop Error:', {